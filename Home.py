@@ -1,13 +1,11 @@
 import streamlit as st
-import os
+from utils.images import show_image
 
 # --- Page Config ---
 st.set_page_config(page_title="AirbnbManhattan", page_icon="🏡", layout="wide")
 
-# --- Hero Banner Image  ---
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-IMAGE_PATH = os.path.join(CURRENT_DIR, "images", "banner_airbnb.png")
-st.image(IMAGE_PATH, use_container_width=True)
+# --- Hero Banner Image (resized variant, cached in memory) ---
+show_image("banner_airbnb.png")
 
 # --- Title Section ---
 st.markdown("""
@@ -26,13 +24,16 @@ Amid this bustling landscape, **Airbnb** has become a **key player** in shaping
 """)
 
 # --- Journey Section with Buttons ---
-st.markdown("Our discovery journey unfolds across **four vibrant chapters**:")
+st.markdown("Our discovery journey unfolds across **seven vibrant chapters**:")
 
 rows = [
     ("📄 **About the Project**", "pages/About_the_Project.py", "Project background, data sources, and research goals."),
     ("🗺️ **Map Exploration**", "pages/Map_Exploration.py", "An interactive map of Airbnb listings across neighborhoods."),
     ("💲 **Price Insights**", "pages/Price_Insights.py", "Active dives into pricing trends, distribution, and spreads."),
-    ("📝 **Review Narratives**", "pages/Review_Narratives.py", "Sentiment and topic analysis of guest reviews.")
+    ("📝 **Review Narratives**", "pages/Review_Narratives.py", "Sentiment and topic analysis of guest reviews."),
+    ("📈 **Review Trends**", "pages/Review_Trends.py", "How review volume, sentiment, and ratings evolve month by month."),
+    ("🔎 **Comparable Listings**", "pages/Comparable_Listings.py", "Price any listing against its nearest comparable listings."),
+    ("🏢 **Host Portfolios**", "pages/Host_Portfolios.py", "Who runs multiple listings, where, and at what price.")
 ]
 
 for label, page, description in rows:
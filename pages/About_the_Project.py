@@ -1,7 +1,7 @@
 import streamlit as st
-import os
 import pandas as pd
 import pydeck as pdk
+from utils.images import show_image
 
 st.set_page_config(page_title="About the Project", page_icon="📄", layout="wide")
 
@@ -107,12 +107,9 @@ At the beginning of the project, we focused on outlining the types of graphs and
 We mapped out visualizations including location maps, price distributions, review sentiment analysis, and correlation heatmaps to explore different aspects of Airbnb listings in Manhattan.
 
 """)
-# --- Safe path construction ---
-CURRENT_DIR = os.path.dirname(__file__)
-IMAGE_PATH_1 = os.path.join(CURRENT_DIR, "..", "images", "process_book_1.png")
-
-# --- Display the image ---
-st.image(IMAGE_PATH_1, use_container_width=True)
+# --- Display the image (only loaded once expanded) ---
+if st.toggle("Show brainstorming sketch", key="process_book_1"):
+    show_image("process_book_1.png")
 
 st.markdown("""
 ---
@@ -123,12 +120,9 @@ As we progressed, we moved into planning the layout for our Streamlit website.
 In this phase, we refined the project structure into sections (Home, Map, Statistics, Text Analysis) and detailed the interactive widgets, such as neighborhood filters, price sliders, room type selectors, and topic-specific dropdowns, to make the user experience dynamic and engaging.
 
 """)
-# --- Safe path construction ---
-CURRENT_DIR = os.path.dirname(__file__)
-IMAGE_PATH_2 = os.path.join(CURRENT_DIR, "..", "images", "process_book_2.jpg")
-
-# --- Display the image ---
-st.image(IMAGE_PATH_2, use_container_width=True)
+# --- Display the image (only loaded once expanded) ---
+if st.toggle("Show website layout plan", key="process_book_2"):
+    show_image("process_book_2.jpg")
 
 st.markdown("---")
 
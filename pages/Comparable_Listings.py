@@ -0,0 +1,179 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import pydeck as pdk
+from utils.filters import city_selector
+from utils.store import available_partitions, shared_listings, shared_view
+from utils.views import comparables_index
+
+st.set_page_config(page_title="Comparable Listings", page_icon="🔎", layout="wide")
+
+# --- City / borough (only their data partitions are loaded) ---
+city, boroughs = city_selector(available_partitions())
+
+st.title(f"🔎 {', '.join(boroughs) if boroughs else city} Comparable Listings Pricing")
+st.markdown("---")
+
+# --- Build the nearest-neighbour index once per dataset version (kept under the memory budget) ---
+def load_comparables_index(dataset_key, listings):
+    return shared_view(
+        "comparables_index", dataset_key, lambda: comparables_index(listings, dataset_key),
+        "Building the nearest-neighbour index…",
+    )
+
+
+all_listings, DATASET_KEY = shared_listings(city, boroughs)
+comp_index = load_comparables_index(DATASET_KEY, all_listings)
+listings = comp_index.listings
+
+# --- Airbnb pink/red shades ---
+airbnb_colors = ['#FFCDD2', '#E57373', '#F44336', '#D32F2F']
+
+# =========================
+# Target Listing
+# =========================
+
+st.markdown("## Choose a Target")
+
+target_mode = st.radio(
+    "Find comparables for:",
+    ["An existing listing", "A dropped pin"],
+    horizontal=True
+)
+
+neighborhoods = sorted(listings['neighbourhood'].unique())
+centroids = listings.groupby('neighbourhood')[['latitude', 'longitude']].median()
+
+if target_mode == "An existing listing":
+    col1, col2 = st.columns(2)
+    with col1:
+        target_neighborhood = st.selectbox("Neighborhood:", neighborhoods)
+    candidates = listings[listings['neighbourhood'] == target_neighborhood]
+    with col2:
+        target_pos = st.selectbox(
+            "Listing:",
+            candidates.index,
+            format_func=lambda i: f"{listings.at[i, 'listing_name']} (${listings.at[i, 'price']:,.0f})"
+        )
+    target = listings.loc[target_pos]
+    target_room_type = target['room_type']
+    target_lat, target_lon = target['latitude'], target['longitude']
+    target_bedrooms, target_beds = target['bedrooms'], target['beds']
+    target_price = target['price']
+    exclude_id = target['listing_id']
+else:
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        pin_neighborhood = st.selectbox("Drop pin in neighborhood:", neighborhoods)
+        target_room_type = st.selectbox("Room Type:", comp_index.room_types)
+    with col2:
+        target_lat = st.number_input("Latitude:", value=float(centroids.loc[pin_neighborhood, 'latitude']), format="%.5f")
+        target_lon = st.number_input("Longitude:", value=float(centroids.loc[pin_neighborhood, 'longitude']), format="%.5f")
+    with col3:
+        target_bedrooms = st.number_input("Bedrooms:", min_value=0, max_value=10, value=1)
+        target_beds = st.number_input("Beds:", min_value=0, max_value=16, value=1)
+    asking_price = st.number_input("Your price (USD, optional):", min_value=0, value=0, step=10)
+    target_price = asking_price or None
+    exclude_id = None
+
+k = st.slider("Number of comparables (K):", min_value=5, max_value=50, value=15, step=5)
+
+comps = comp_index.query(
+    target_room_type, target_lat, target_lon, target_bedrooms, target_beds,
+    k=k, exclude_id=exclude_id
+)
+
+st.markdown("---")
+
+# =========================
+# Price vs Comparables
+# =========================
+
+st.markdown("## Price vs Comparables")
+
+if comps.empty:
+    st.warning("⚠️ No comparable listings found for this room type.")
+else:
+    median_price = comps['price'].median()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Comparables median", f"${median_price:,.0f}")
+    col2.metric(
+        "Comparables IQR",
+        f"${comps['price'].quantile(0.25):,.0f} – ${comps['price'].quantile(0.75):,.0f}"
+    )
+    if target_price is not None:
+        percentile = (comps['price'] < target_price).mean() * 100
+        col3.metric(
+            "Target price",
+            f"${target_price:,.0f}",
+            delta=f"{target_price - median_price:+,.0f} vs median · {percentile:.0f}th pct",
+            delta_color="off"
+        )
+
+    # --- Price distribution of comparables ---
+    fig = px.histogram(
+        comps,
+        x='price',
+        nbins=20,
+        color_discrete_sequence=[airbnb_colors[2]],
+        labels={'price': 'Listing Price (USD)'}
+    )
+    if target_price is not None:
+        fig.add_vline(x=target_price, line_dash="dash", line_color="black", annotation_text="Target")
+    fig.add_vline(x=median_price, line_color=airbnb_colors[3], annotation_text="Median")
+
+    fig.update_layout(
+        template='plotly_white',
+        height=450,
+        font=dict(color='black', family='Arial'),
+        xaxis_title="Price (USD)",
+        yaxis_title="Number of Listings",
+        xaxis_tickformat="$,.0f",
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
+
+    # --- Map of target and comparables ---
+    map_df = comps.assign(color=[[229, 115, 115, 180]] * len(comps))
+    target_df = pd.DataFrame({
+        'listing_name': ["Target"],
+        'latitude': [target_lat],
+        'longitude': [target_lon],
+        'price': [target_price if target_price is not None else float('nan')],
+        'color': [[0, 0, 0, 220]],
+    })
+
+    layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=pd.concat([map_df, target_df], ignore_index=True),
+        get_position='[longitude, latitude]',
+        get_fill_color='color',
+        get_radius=60,
+        pickable=True,
+    )
+
+    view_state = pdk.ViewState(latitude=target_lat, longitude=target_lon, zoom=13.5, pitch=0)
+
+    tooltip = {
+        "html": "<b>{listing_name}</b><br/>💲{price} USD",
+        "style": {"backgroundColor": "white", "color": "black", "fontSize": "12px"}
+    }
+
+    st.pydeck_chart(pdk.Deck(
+        layers=[layer],
+        initial_view_state=view_state,
+        tooltip=tooltip,
+        map_style="mapbox://styles/mapbox/light-v9"
+    ))
+
+    # --- Comparable listings table ---
+    st.dataframe(
+        comps[['listing_name', 'neighbourhood', 'room_type', 'bedrooms', 'beds', 'price', 'review_scores_rating', 'distance_km']],
+        use_container_width=True
+    )
+
+st.markdown("---")
+
+# --- Footer ---
+st.caption("© 2025 · Columbia University")
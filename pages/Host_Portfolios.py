@@ -0,0 +1,198 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import pydeck as pdk
+from utils.filters import city_selector
+from utils.hosts import MULTI_LISTING, portfolio_sizes
+from utils.store import available_partitions, shared_listings, shared_view
+from utils.views import host_portfolios
+
+st.set_page_config(page_title="Host Portfolios", page_icon="🏢", layout="wide")
+
+# --- City / borough (only their data partitions are loaded) ---
+city, boroughs = city_selector(available_partitions())
+
+st.title(f"🏢 {', '.join(boroughs) if boroughs else city} Airbnb Host Portfolios")
+st.markdown("---")
+
+# --- Host aggregates and host -> listings index, built once per dataset version (kept under the memory budget) ---
+def load_host_portfolios(dataset_key, listings):
+    return shared_view(
+        "host_portfolios", dataset_key, lambda: host_portfolios(listings, dataset_key), "Building host portfolios…"
+    )
+
+
+all_listings, DATASET_KEY = shared_listings(city, boroughs)
+portfolios = load_host_portfolios(DATASET_KEY, all_listings)
+hosts = portfolios.hosts
+
+# --- Airbnb pink/red shades ---
+airbnb_colors = ['#FFCDD2', '#E57373', '#F44336', '#D32F2F']
+
+# =========================
+# Host Overview
+# =========================
+
+st.markdown("## Host Overview")
+
+summary = portfolios.summary()
+col1, col2, col3 = st.columns(3)
+col1.metric("Hosts", f"{summary['hosts']:,}")
+col2.metric(f"Hosts with {MULTI_LISTING}+ listings", f"{summary['multi_listing_hosts']:,}")
+col3.metric("Listings run by multi-listing hosts", f"{summary['multi_listing_share']:.0%}")
+
+fig_sizes = px.bar(
+    portfolio_sizes(hosts),
+    x='Listings per host',
+    y='Hosts',
+    color_discrete_sequence=[airbnb_colors[2]],
+    log_y=True,
+)
+fig_sizes.update_layout(
+    template='plotly_white',
+    height=400,
+    font=dict(color='black', family='Arial'),
+    yaxis_title="Number of Hosts (log scale)",
+)
+st.plotly_chart(fig_sizes, use_container_width=True)
+
+st.markdown("---")
+
+# =========================
+# Top Hosts
+# =========================
+
+st.markdown("## Top Hosts")
+
+neighborhoods = sorted(portfolios.listings['neighbourhood'].dropna().unique())
+
+col1, col2 = st.columns(2)
+with col1:
+    top_neighborhood = st.selectbox("Neighborhood:", ['All'] + neighborhoods)
+with col2:
+    min_listings = st.slider("Minimum listings per host:", 1, 20, value=MULTI_LISTING, key="host_min_listings")
+
+top = portfolios.top_hosts(
+    None if top_neighborhood == 'All' else top_neighborhood,
+    n=20, min_listings=min_listings,
+)
+
+if top.empty:
+    st.warning("⚠️ No hosts match the selected filters.")
+else:
+    columns = {
+        'host_name': "Host",
+        'listings_here': f"Listings in {top_neighborhood}",
+        'listings': "Listings",
+        'neighbourhoods': "Neighborhoods",
+        'main_neighbourhood': "Main Neighborhood",
+        'entire_homes': "Entire Homes",
+        'median_price': "Median Price",
+        'avg_rating': "Avg Rating",
+        'reviews': "Reviews",
+        'max_spread_km': "Spread (km)",
+    }
+    st.dataframe(
+        top[[c for c in columns if c in top.columns]].rename(columns=columns),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Median Price": st.column_config.NumberColumn(format="$%.0f"),
+            "Avg Rating": st.column_config.NumberColumn(format="%.2f"),
+            "Spread (km)": st.column_config.NumberColumn(format="%.1f"),
+        }
+    )
+
+st.markdown("---")
+
+# =========================
+# Host Portfolio
+# =========================
+
+st.markdown("## Host Portfolio")
+
+# --- Largest hosts first, or any host by name / id; the index makes its portfolio a direct lookup ---
+host_query = st.text_input("Search hosts by name or host id:", key="host_search")
+host_choices = portfolios.search(host_query) if host_query.strip() else hosts.head(1000)
+if host_query.strip() and host_choices.empty:
+    st.warning("⚠️ No host matches your search.")
+host_labels = dict(zip(
+    host_choices['host_id'],
+    host_choices['host_name'].astype(str) + " (" + host_choices['listings'].astype(str) + " listings, id "
+    + host_choices['host_id'].astype(str) + ")"
+))
+selected_host = st.selectbox("Host:", list(host_labels), format_func=host_labels.get)
+
+if selected_host is not None:
+    host = portfolios.host(selected_host)
+    portfolio = portfolios.portfolio(selected_host)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Listings", f"{host['listings']:,}")
+    col2.metric("Median Price", f"${host['median_price']:,.0f}" if pd.notna(host['median_price']) else "–")
+    col3.metric("Average Rating", f"{host['avg_rating']:.2f}" if pd.notna(host['avg_rating']) else "–")
+    col4.metric(
+        "Farthest Listing from Centre",
+        f"{host['max_spread_km']:.1f} km" if pd.notna(host['max_spread_km']) else "–",
+    )
+
+    # --- Price and rating distributions ---
+    col1, col2 = st.columns(2)
+    with col1:
+        fig_price = px.histogram(
+            portfolio, x='price', nbins=20,
+            color_discrete_sequence=[airbnb_colors[2]],
+            labels={'price': 'Listing Price (USD)'}
+        )
+        fig_price.update_layout(
+            template='plotly_white', height=380, font=dict(color='black', family='Arial'),
+            title_text="Price Distribution", yaxis_title="Number of Listings", xaxis_tickformat="$,.0f",
+        )
+        st.plotly_chart(fig_price, use_container_width=True)
+    with col2:
+        fig_rating = px.histogram(
+            portfolio, x='review_scores_rating', nbins=20,
+            color_discrete_sequence=[airbnb_colors[3]],
+            labels={'review_scores_rating': 'Review Rating'}
+        )
+        fig_rating.update_layout(
+            template='plotly_white', height=380, font=dict(color='black', family='Arial'),
+            title_text="Rating Distribution", yaxis_title="Number of Listings",
+        )
+        st.plotly_chart(fig_rating, use_container_width=True)
+
+    # --- Geographic spread of the portfolio ---
+    map_df = portfolio.dropna(subset=['latitude', 'longitude'])
+    if map_df.empty:
+        st.info("ℹ️ None of this host's listings have coordinates to map.")
+    else:
+        layer = pdk.Layer(
+            "ScatterplotLayer",
+            data=map_df,
+            get_position='[longitude, latitude]',
+            get_fill_color=[244, 67, 54, 180],
+            get_radius=60,
+            radius_min_pixels=4,
+            pickable=True,
+        )
+        view_state = pdk.ViewState(
+            latitude=float(map_df['latitude'].median()),
+            longitude=float(map_df['longitude'].median()),
+            zoom=12 if host['max_spread_km'] < 3 else 11,
+            pitch=0,
+        )
+        tooltip = {
+            "html": "<b>{listing_name}</b><br/>🏘️ {neighbourhood}<br/>💲{price} USD<br/>🏠 {room_type}",
+            "style": {"backgroundColor": "white", "color": "black", "fontSize": "12px"}
+        }
+        st.pydeck_chart(pdk.Deck(
+            layers=[layer],
+            initial_view_state=view_state,
+            tooltip=tooltip,
+            map_style="mapbox://styles/mapbox/light-v9"
+        ))
+
+st.markdown("---")
+
+# --- Footer ---
+st.caption("© 2025 · Columbia University")
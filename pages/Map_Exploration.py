@@ -1,50 +1,115 @@
 import streamlit as st
-import os
+import numpy as np
 import pandas as pd
 import pydeck as pdk
+from utils.filters import (
+    city_selector, filter_options, filter_positions, normalize_selection, shared_multiselect, shared_slider,
+)
+from utils.spatial import haversine_m, radius_bounds, viewport_bounds
+from utils.store import available_partitions, shared_reviews, shared_sql, shared_view
+from utils.views import map_view
 
 st.set_page_config(page_title="Map Exploration", page_icon="🗺️", layout="wide")
 
-st.title("🗺️ Manhattan Airbnb Map")
+# --- City / borough (only their data partitions are loaded) ---
+city, boroughs = city_selector(available_partitions())
+area_name = ", ".join(boroughs) if boroughs else city
+
+st.title(f"🗺️ {area_name} Airbnb Map")
 st.markdown("---")
 
-# Load and clean data
-# --- Build safe file path ---
-CURRENT_DIR = os.path.dirname(__file__)  # this points to /pages/
-DATA_PATH = os.path.join(CURRENT_DIR, "..", "data", "airbnb_cleaned.csv")
+# --- Build the map view and spatial index once per dataset version (kept under the memory budget) ---
+def load_map_data(dataset_key, df):
+    return shared_view("map_view", dataset_key, lambda: map_view(df, dataset_key), "Building the map…")
+
 
-# --- Load data ---
-df = pd.read_csv(DATA_PATH)
-df1 = df.copy()
-df1['price'] = df1['price'].replace('[\$,]', '', regex=True).astype(float)
-df1['rating'] = df1['review_scores_rating'] if 'review_scores_rating' in df1.columns else None
-df1 = df1.dropna(subset=['latitude', 'longitude', 'price', 'room_type', 'neighbourhood', 'rating'])
+# --- SQL backend (AIRBNB_BACKEND=sqlite): attribute and bounding-box filters run in SQLite ---
+@st.cache_data(show_spinner=False)
+def sql_map_options(dataset_key, _db, city, boroughs):
+    return _db.filter_options(city, boroughs), _db.map_centres(city, boroughs)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def sql_map_rows(dataset_key, _db, city, boroughs, bbox, neighbourhoods, room_types, price_range, rating_range):
+    return _db.map_rows(
+        city, boroughs, bbox=bbox, neighbourhoods=neighbourhoods, room_types=room_types,
+        price_range=price_range, rating_range=rating_range,
+    )
 
-# Rename and deduplicate
-df1 = df1.rename(columns={"room_type": "Room Type"})
-if 'listing_id' in df1.columns and 'review_date' in df1.columns:
-    df1 = df1.sort_values('review_date').drop_duplicates('listing_id', keep='last')
 
+db = shared_sql()
+
+if db is None:
+    df, reviews_key = shared_reviews(city, boroughs)
+    DATASET_KEY = ("map",) + reviews_key
+    df1, spatial_index, neighbourhood_centroids = load_map_data(DATASET_KEY, df)
+    options = filter_options(DATASET_KEY, df1, room_type_col='Room Type')
+    area_lat, area_lon = df1['latitude'].mean(), df1['longitude'].mean()
+else:
+    DATASET_KEY = ('sql', db.version)
+    options, ((area_lat, area_lon), neighbourhood_centroids) = sql_map_options(DATASET_KEY, db, city, boroughs)
+
+# Sidebar: map area
+st.sidebar.header("Map Area")
+
+area_mode = st.sidebar.radio(
+    "Show listings:",
+    ["All listings", "Around the centre (zoom)", "Within a radius"],
+    help="\"Around the centre\" keeps the listings in the area the map shows at the centre and zoom "
+         "chosen below; panning or zooming the map itself does not change it.",
+)
+
+center_options = [area_name] + list(neighbourhood_centroids.index) + ["Custom point"]
+center_choice = st.sidebar.selectbox("Centre map on:", center_options)
+
+if center_choice == area_name:
+    center_lat, center_lon = area_lat, area_lon
+elif center_choice == "Custom point":
+    center_lat = st.sidebar.number_input("Latitude:", value=float(area_lat), format="%.5f")
+    center_lon = st.sidebar.number_input("Longitude:", value=float(area_lon), format="%.5f")
+else:
+    center_lat, center_lon = neighbourhood_centroids.loc[center_choice]
+
+zoom = st.sidebar.slider("Zoom:", 10.0, 16.0, value=11.5, step=0.5)
+
+radius_m = None
+bbox = None
+if area_mode == "Within a radius":
+    radius_m = st.sidebar.slider("Radius (metres):", 100, 5000, value=1000, step=100)
+    bbox = radius_bounds(center_lat, center_lon, radius_m)
+elif area_mode == "Around the centre (zoom)":
+    bbox = viewport_bounds(center_lat, center_lon, zoom)
 
 # Sidebar filters
 st.sidebar.header("Filters")
 
-neighborhoods = st.sidebar.multiselect(
+neighborhoods = shared_multiselect(
     "Neighborhood:",
-    options=sorted(df1['neighbourhood'].unique()),
-    default=[]
+    'neighbourhoods',
+    options['neighbourhoods'],
+    default=[],
+    key="map_neighborhood_multiselect",
+    container=st.sidebar,
+    has_all=False
 )
 
-room_types = st.sidebar.multiselect(
+room_types = shared_multiselect(
     "Room Type:",
-    options=sorted(df1['Room Type'].unique()),
-    default=[]
+    'room_types',
+    options['room_types'],
+    default=[],
+    key="map_room_type_multiselect",
+    container=st.sidebar,
+    has_all=False
 )
 
-price_range = st.sidebar.slider(
+price_range = shared_slider(
     "Price Range:",
-    0, int(df1['price'].clip(upper=1000).max()),
-    value=(330, 500),
+    'price_range',
+    0, min(options['price_max'], 1000),
+    default=(330, 500),
+    key="map_price_slider",
+    container=st.sidebar,
     step=10
 )
 
@@ -55,19 +120,27 @@ rating_range = st.sidebar.slider(
     step=0.1
 )
 
-# Filter Data
-dff = df1.copy()
-
-if neighborhoods:
-    dff = dff[dff['neighbourhood'].isin(neighborhoods)]
-if room_types:
-    dff = dff[dff['Room Type'].isin(room_types)]
-dff = dff[(dff['price'] >= price_range[0]) & (dff['price'] <= price_range[1])]
-dff = dff[(dff['rating'] >= rating_range[0]) & (dff['rating'] <= rating_range[1])]
-
-# Drop duplicates again if needed
-if 'listing_id' in dff.columns and 'review_date' in dff.columns:
-    dff = dff.sort_values('review_date').drop_duplicates('listing_id', keep='last')
+# Filter Data: attribute matches come from the shared cache (or SQLite), then
+# only the listings inside the selected area are kept, coloured and drawn
+map_filters = dict(
+    neighbourhoods=normalize_selection(neighborhoods or None, options['neighbourhoods']),
+    room_types=normalize_selection(room_types or None, options['room_types']),
+    price_range=tuple(price_range),
+    rating_range=tuple(rating_range),
+)
+if db is None:
+    matches = filter_positions(
+        df1, DATASET_KEY, columns={'room_types': 'Room Type', 'rating_range': 'rating'}, **map_filters
+    )
+    if radius_m is not None:
+        matches = np.intersect1d(matches, spatial_index.query_radius(center_lat, center_lon, radius_m), assume_unique=True)
+    elif bbox is not None:
+        matches = np.intersect1d(matches, spatial_index.query_bbox(*bbox), assume_unique=True)
+    dff = df1.iloc[matches]
+else:
+    dff = sql_map_rows(DATASET_KEY, db, city, boroughs, bbox, **map_filters)
+    if radius_m is not None:
+        dff = dff[haversine_m(center_lat, center_lon, dff['latitude'].to_numpy(), dff['longitude'].to_numpy()) <= radius_m]
 
 # Assign different colors based on Room Type
 room_type_colors = {
@@ -76,7 +149,7 @@ room_type_colors = {
     "Shared room": [0, 255, 0, 160],        
     "Hotel room": [255, 165, 0, 160]        
 }
-dff["color"] = dff["Room Type"].map(lambda x: room_type_colors.get(x, [128, 128, 128, 160]))
+dff = dff.assign(color=dff["Room Type"].map(lambda x: room_type_colors.get(x, [128, 128, 128, 160])))
 
 # Map
 st.markdown("## Explore the Map")
@@ -116,11 +189,30 @@ else:
         get_radius=80,
         pickable=True,
     )
+    layers = [layer]
+
+    # Outline the search radius
+    if radius_m is not None:
+        layers.append(pdk.Layer(
+            "ScatterplotLayer",
+            data=pd.DataFrame({"latitude": [center_lat], "longitude": [center_lon]}),
+            get_position='[longitude, latitude]',
+            get_radius=radius_m,
+            filled=False,
+            stroked=True,
+            get_line_color=[80, 80, 80, 200],
+            line_width_min_pixels=2,
+        ))
+
+    if area_mode == "All listings" and center_choice == area_name:
+        view_lat, view_lon = dff['latitude'].mean(), dff['longitude'].mean()
+    else:
+        view_lat, view_lon = center_lat, center_lon
 
     view_state = pdk.ViewState(
-        latitude=dff['latitude'].mean(),
-        longitude=dff['longitude'].mean(),
-        zoom=11.5,
+        latitude=view_lat,
+        longitude=view_lon,
+        zoom=zoom,
         pitch=0,
     )
 
@@ -134,7 +226,7 @@ else:
     }
 
     deck = pdk.Deck(
-        layers=[layer],
+        layers=layers,
         initial_view_state=view_state,
         tooltip=tooltip,
         map_style="mapbox://styles/mapbox/light-v9"
@@ -1,22 +1,55 @@
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 import streamlit as st
-import os
+from utils.charts import average_price_bar, binned_histogram_chart, price_box, price_box_stats_chart
+from utils.filters import (
+    city_selector, filter_options, filter_rows, normalize_selection, shared_multiselect, shared_slider,
+)
+from utils.queries import price_histogram
+from utils.store import available_partitions, shared_reviews, shared_sql
+from utils.views import average_price_table
 
 st.set_page_config(page_title="Price Insights", page_icon="💲", layout="wide")
 
-st.title("💲 Manhattan Airbnb Listing Price")
+# --- City / borough (only their data partitions are loaded) ---
+city, boroughs = city_selector(available_partitions())
+
+st.title(f"💲 {', '.join(boroughs) if boroughs else city} Airbnb Listing Price")
 st.markdown("---")
 
-# --- Build safe file path ---
-CURRENT_DIR = os.path.dirname(__file__)  # this points to /pages/
-DATA_PATH = os.path.join(CURRENT_DIR, "..", "data", "airbnb_cleaned.csv")
+# --- SQL backend (AIRBNB_BACKEND=sqlite): filters and group-bys run in SQLite ---
+@st.cache_data(show_spinner=False)
+def sql_filter_options(dataset_key, _db, city, boroughs):
+    return _db.filter_options(city, boroughs)
+
+
+@st.cache_data(show_spinner=False)
+def sql_average_price(dataset_key, _db, city, boroughs):
+    return _db.average_price(city, boroughs)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def sql_price_histogram(dataset_key, _db, city, boroughs, price_range, neighbourhoods, room_types):
+    return _db.price_histogram(
+        city, boroughs, bins=50, price_range=price_range, neighbourhoods=neighbourhoods, room_types=room_types
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def sql_price_box_stats(dataset_key, _db, city, boroughs, neighbourhoods, room_types):
+    return _db.price_box_stats(city, boroughs, neighbourhoods=neighbourhoods, room_types=room_types)
+
+
+db = shared_sql()
+
+# --- Load data (one read-only copy shared by all sessions) ---
+if db is None:
+    df2, DATASET_KEY = shared_reviews(city, boroughs)
+    avg_price = average_price_table(df2, DATASET_KEY)
+    options = filter_options(DATASET_KEY, df2)
+else:
+    DATASET_KEY = ('sql', db.version)
+    avg_price = sql_average_price(DATASET_KEY, db, city, boroughs)
+    options = sql_filter_options(DATASET_KEY, db, city, boroughs)
 
-# --- Load data ---
-df = pd.read_csv(DATA_PATH)
-df2 = df.copy()
-df2['price'] = df2['price'].replace('[\$,]', '', regex=True).astype(float)
 
 # =========================
 # Chart 1: Top Neighborhoods
@@ -24,15 +57,9 @@ df2['price'] = df2['price'].replace('[\$,]', '', regex=True).astype(float)
 
 st.markdown("## Average Airbnb Price")
 
-# --- Preprocessing: calculate average price ---
-avg_price = df2.groupby(['neighbourhood', 'room_type'])['price'].mean().reset_index()
-
-# --- Airbnb pink/red shades ---
-airbnb_colors = ['#FFCDD2', '#E57373', '#F44336', '#D32F2F']
-
 # --- Unique options ---
-neighborhoods = sorted(avg_price['neighbourhood'].unique())
-room_types = sorted(avg_price['room_type'].unique())
+neighborhoods = options['neighbourhoods']
+room_types = options['room_types']
 
 # Insert 'All' at the top
 neighborhood_options = ['All'] + neighborhoods
@@ -43,16 +70,20 @@ room_type_options = ['All'] + room_types
 # Default selections
 default_neighborhoods = ['Chelsea', 'Harlem', 'Hell\'s Kitchen', 'Lower East Side', 'Midtown']
 
-selected_neighborhoods = st.multiselect(
+selected_neighborhoods = shared_multiselect(
     "Select Neighborhood(s):",
+    'neighbourhoods',
     neighborhood_options,
-    default=[n for n in default_neighborhoods if n in neighborhoods]
+    default=[n for n in default_neighborhoods if n in neighborhoods],
+    key="neighborhood_bar_multiselect"
 )
 
-selected_room_types = st.multiselect(
+selected_room_types = shared_multiselect(
     "Select Room Type(s):",
+    'room_types',
     room_type_options,
-    default=['All']
+    default=['All'],
+    key="room_type_bar_multiselect"
 )
 
 # --- Logic to handle 'All' selection ---
@@ -82,28 +113,7 @@ elif filtered_data.empty:
     st.warning("⚠️ No matching data found with your selections.")
 else:
     # --- Create figure ---
-    fig = px.bar(
-        filtered_data,
-        x='neighbourhood',
-        y='price',
-        color='room_type',
-        barmode='group',
-        color_discrete_sequence=airbnb_colors,
-        labels={'price': 'Average Price (USD)', 'neighbourhood': 'Neighborhood'}
-    )
-
-    fig.update_layout(
-        template='plotly_white',
-        width=1000,
-        height=600,
-        font=dict(color='black', family='Arial'),
-        legend_title_text="Room Type",
-        legend_title_font=dict(color='black', size=16),
-        legend_font=dict(color='black', size=14),
-        xaxis_tickangle=-30,
-        margin=dict(b=150),
-    )
-
+    fig = average_price_bar(filtered_data)
     st.plotly_chart(fig, use_container_width=True)
 
 st.markdown("---")
@@ -115,79 +125,56 @@ st.markdown("---")
 st.markdown("## Airbnb Price Distribution")
 
 # Neighborhood filter
-neighborhoods = sorted(df2['neighbourhood'].unique())
-neighborhood_options = ['All'] + neighborhoods
-
-selected_neighborhoods = st.multiselect(
+selected_neighborhoods = shared_multiselect(
     "Select Neighborhood(s):",
+    None,
     neighborhood_options,
     default=['All'],
     key="neighborhood_multiselect"
 )
 
 # Room type filter
-room_types = sorted(df2['room_type'].unique())
-room_type_options = ['All'] + room_types
-
-selected_room_types = st.multiselect(
+selected_room_types = shared_multiselect(
     "Select Room Type(s):",
+    None,
     room_type_options,
     default=['All'],
     key="room_type_multiselect"
 )
 
-# --- Apply filters ---
-
-# Filter Neighborhood
-if 'All' in selected_neighborhoods:
-    filtered_df = df2.copy()
-else:
-    filtered_df = df2[df2['neighbourhood'].isin(selected_neighborhoods)]
-
-# Filter Room Type
-if 'All' not in selected_room_types:
-    filtered_df = filtered_df[filtered_df['room_type'].isin(selected_room_types)]
-
 # --- Price Range Slider ---
-max_price = int(df2['price'].max())
+max_price = options['price_max']
 
-price_range = st.slider(
+price_range = shared_slider(
     "Select Price Range:",
+    'price_range',
     min_value=0,
     max_value=max_price,
-    value=(0, 800),
+    default=(0, 800),
+    key="price_hist_slider",
     step=10,
     format="$%d"
 )
 
-# Filter based on price range
-filtered_df = filtered_df[(filtered_df['price'] >= price_range[0]) & (filtered_df['price'] <= price_range[1])]
+# --- Apply filters and bin the prices ---
+hist_filters = dict(
+    neighbourhoods=normalize_selection(selected_neighborhoods, neighborhoods),
+    room_types=normalize_selection(selected_room_types, room_types),
+)
+if db is None:
+    hist = price_histogram(
+        filter_rows(df2, DATASET_KEY, price_range=price_range, **hist_filters),
+        bins=50, price_range=price_range,
+    )
+else:
+    hist = sql_price_histogram(DATASET_KEY, db, city, boroughs, tuple(price_range), **hist_filters)
 
 # --- Warning if nothing matches ---
-if filtered_df.empty:
+if hist['count'].sum() == 0:
     st.warning("⚠️ No listings found for the selected filters. Please adjust neighborhood, room type, or price range.")
 else:
     # --- Plot ---
-    fig = px.histogram(
-        filtered_df,
-        x='price',
-        nbins=50,
-        color_discrete_sequence=[airbnb_colors[2]],  # Darker pink for bars
-        labels={'price': 'Listing Price (USD)'}
-    )
-
-    fig.update_layout(
-        template='plotly_white',
-        width=1000,
-        height=600,
-        title_text=None,
-        font=dict(color='black', family='Arial'),
-        xaxis_title="Price (USD)",
-        yaxis_title="Number of Listings",
-        xaxis_tickformat="$,.0f",
-        margin=dict(b=150),
-    )
-
+    fig = binned_histogram_chart(hist)
     st.plotly_chart(fig, use_container_width=True)
 
 st.markdown("---")
@@ -201,74 +188,42 @@ st.markdown("## Airbnb Price Spread")
 # --- Sidebar Filters ---
 
 # Neighborhood filter
-neighborhoods = sorted(df2['neighbourhood'].unique())
-neighborhood_options = ['All'] + neighborhoods
-
-# Default selection
-default_neighborhoods = ['Chelsea', 'Harlem', 'Hell\'s Kitchen', 'Lower East Side', 'Midtown']
-
-selected_neighborhoods = st.multiselect(
+selected_neighborhoods = shared_multiselect(
     "Select Neighborhood(s):",
+    None,
     neighborhood_options,
     default=[n for n in default_neighborhoods if n in neighborhoods],
     key="neighborhood_box_multiselect"
 )
 
 # Room type filter
-room_types = sorted(df2['room_type'].unique())
-room_type_options = ['All'] + room_types
-
-selected_room_types = st.multiselect(
+selected_room_types = shared_multiselect(
     "Select Room Type(s):",
+    None,
     room_type_options,
     default=['All'],
     key="roomtype_box_multiselect"
 )
 
-# --- Apply filters ---
-
-# Filter Neighborhood
-if 'All' in selected_neighborhoods:
-    filtered_df = df2.copy()
-else:
-    filtered_df = df2[df2['neighbourhood'].isin(selected_neighborhoods)]
-
-# Filter Room Type
-if 'All' not in selected_room_types:
-    filtered_df = filtered_df[filtered_df['room_type'].isin(selected_room_types)]
+# --- Apply filters (box statistics computed in SQLite when it is the backend) ---
+box_filters = dict(
+    neighbourhoods=normalize_selection(selected_neighborhoods, neighborhoods),
+    room_types=normalize_selection(selected_room_types, room_types),
+)
 
-# --- Warning if nothing matches ---
-if filtered_df.empty:
-    st.warning("⚠️ No listings found for the selected filters. Please adjust neighborhood or room type.")
+if db is None:
+    filtered_df = filter_rows(df2, DATASET_KEY, **box_filters)
+    if filtered_df.empty:
+        st.warning("⚠️ No listings found for the selected filters. Please adjust neighborhood or room type.")
+    else:
+        st.plotly_chart(price_box(filtered_df), use_container_width=True)
 else:
-    # --- Plot ---
-    fig = px.box(
-        filtered_df,
-        x='neighbourhood',
-        y='price',
-        color='room_type',
-        points='outliers',  # Show outlier points
-        color_discrete_sequence=airbnb_colors,
-        labels={'price': 'Listing Price (USD)', 'neighbourhood': 'Neighborhood'}
-    )
-
-    fig.update_layout(
-        template='plotly_white',
-        width=1000,
-        height=600,
-        title_text=None,
-        font=dict(color='black', family='Arial'),
-        xaxis_title="Neighborhood",
-        yaxis_title="Price (USD)",
-        xaxis_tickangle=-30,
-        yaxis_tickformat="$,.0f",
-        legend_title_text="Room Type",
-        legend_title_font=dict(color='black', size=16),
-        legend_font=dict(color='black', size=14),
-        margin=dict(b=150),
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
+    box_stats = sql_price_box_stats(DATASET_KEY, db, city, boroughs, **box_filters)
+    if box_stats.empty:
+        st.warning("⚠️ No listings found for the selected filters. Please adjust neighborhood or room type.")
+    else:
+        st.plotly_chart(price_box_stats_chart(box_stats), use_container_width=True)
+        st.caption("Whiskers extend to the most extreme prices within 1.5 × IQR; outlier points are not drawn.")
 
 st.markdown("---")
 
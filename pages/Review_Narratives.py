@@ -1,196 +1,148 @@
+import time
 import streamlit as st
-import os
-import pandas as pd
-import numpy as np
-import seaborn as sns
 import plotly.express as px
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
-from collections import Counter
+from utils.aspects import aspect_by, aspect_definition
+from utils.charts import AIRBNB_RED, figure_png, phrase_wordcloud, sentiment_scatter, topic_radar
+from utils.filters import (
+    city_selector, filter_options, filter_positions, filter_rows, normalize_selection, shared_multiselect, shared_slider,
+)
+from utils.progressive import approximate_caption, progressive_section
+from utils.queries import apply_filters, approximate_topic_mentions, phrase_counts
+from utils.sampling import stratified_sample
+from utils.store import available_partitions, shared_nlp, shared_view
+from utils.text_index import escape_markdown, snippet
+from utils.views import (
+    aspect_table, correlation_png, review_params, sentiment_rows, sentiment_scatter_png, text_index,
+    tier_heatmap_pngs, topic_table, wordcloud_png,
+)
 
 
 st.set_page_config(page_title="Review Narratives", page_icon="📝", layout="wide")
 
-# --- Title ---
-st.title("📝 Manhattan Airbnb Review Analysis")
+# --- City / borough (only their data partitions are loaded) ---
+city, boroughs = city_selector(available_partitions())
+
+st.title(f"📝 {', '.join(boroughs) if boroughs else city} Airbnb Review Analysis")
 st.markdown("---")
 
-# --- Load the processed data ---
-CURRENT_DIR = os.path.dirname(__file__)  # this points to /pages/
-DATA_PATH = os.path.join(CURRENT_DIR, "..", "data", "airbnb_nlp_processes.csv")
-df = pd.read_csv(DATA_PATH)
-
-# --- Clean 'price' ---
-if not np.issubdtype(df['price'].dtype, np.number):
-    df['price'] = (
-        df['price']
-        .astype(str)
-        .str.replace(r'[\$,]', '', regex=True)
-        .astype(float)
+# --- Load the processed data (one read-only copy shared by all sessions) ---
+try:
+    df, DATASET_KEY = shared_nlp(city, boroughs)
+except FileNotFoundError:
+    # airbnb_nlp_processes.csv is optional per partition
+    st.info("ℹ️ No processed review text is available for this city / borough selection.")
+    st.stop()
+options = filter_options(DATASET_KEY, df)
+neighborhoods = options['neighbourhoods']
+neighborhood_options = ['All'] + neighborhoods
+min_price = options['price_min']
+max_price = options['price_max']
+
+# --- Build the review search index once per dataset version (kept under the memory budget) ---
+def load_text_index(dataset_key, df):
+    return shared_view(
+        "text_index", dataset_key, lambda: text_index(df, dataset_key), "Building the review search index…"
     )
 
-# --- LDA Radar Chart ---
 
 # --- LDA Radar Chart ---
 st.markdown("## Review Topic Distribution")
 
 # --- Neighborhood filter with "All" option ---
-neighborhoods = sorted(df['neighbourhood'].dropna().unique())
-neighborhood_options = ['All'] + neighborhoods
-
-selected_neighborhoods = st.multiselect(
+selected_neighborhoods = shared_multiselect(
     "Select Neighborhood(s):",
-    options=neighborhood_options,
-    default=['All']
+    'neighbourhoods',
+    neighborhood_options,
+    default=['All'],
+    key="topic_neighborhood_multiselect"
 )
 
 # --- Price Range Slider ---
-min_price = int(df['price'].min())
-max_price = int(df['price'].max())
-
-selected_price_range = st.slider(
+selected_price_range = shared_slider(
     "Select Price Range:",
+    'price_range',
     min_value=min_price,
     max_value=max_price,
-    value=(0, max_price),
+    default=(0, max_price),
+    key="topic_price_slider",
     step=10,
     format="$%d"
 )
 
 # --- Apply Filters ---
-if 'All' in selected_neighborhoods:
-    filtered_df = df[
-        (df['price'] >= selected_price_range[0]) &
-        (df['price'] <= selected_price_range[1])
-    ]
-else:
-    filtered_df = df[
-        (df['neighbourhood'].isin(selected_neighborhoods)) &
-        (df['price'] >= selected_price_range[0]) &
-        (df['price'] <= selected_price_range[1])
-    ]
+topic_params = review_params(normalize_selection(selected_neighborhoods, neighborhoods), selected_price_range)
+filtered_df = filter_rows(df, DATASET_KEY, **topic_params)
 
 # --- Proceed if filtered data is not empty ---
 if filtered_df.empty:
     st.warning("⚠️ No listings found for the selected filters.")
 else:
-    # --- LDA Topic Modeling ---
-
-    sample_df = filtered_df.sample(min(3000, len(filtered_df)), random_state=42)
-
-    vectorizer = CountVectorizer(max_df=0.9, min_df=10, max_features=3000, stop_words="english")
-    dtm = vectorizer.fit_transform(sample_df['joined_tokens'].fillna(""))
-
-    lda_topics = 5
-    lda = LatentDirichletAllocation(n_components=lda_topics, random_state=42)
-    lda.fit(dtm)
-    sample_df["topic"] = lda.transform(dtm).argmax(axis=1)
-
-    default_labels = [
-        "Transportation", "Service", "Host/Location", "Amenities", "Cleanliness",
-        "Pricing", "Check‑in", "Food", "Noise"
-    ]
-    labels = default_labels[:lda_topics]
-
-    radar_df = (
-        sample_df["topic"].value_counts().sort_index()
-        .reindex(range(lda_topics), fill_value=0)
-        .rename("Mentions")
-        .to_frame()
-        .assign(Topic=labels)
-    )
-
-    # --- Plot Radar Chart in Airbnb Red ---
-    fig_radar = px.line_polar(
-        radar_df,
-        r="Mentions",
-        theta="Topic",
-        line_close=True,
-        width=600,
-        height=600
-    )
-
-    fig_radar.update_traces(
-        fill="toself",
-        line_color="#FF5A5F"
-    )
-
-    fig_radar.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                showticklabels=False,
-                ticks='',
-                gridcolor="lightgray",
-            ),
-            angularaxis=dict(
-                tickfont=dict(size=12, color="black")
-            )
-        ),
-        template="plotly_white",
-        font=dict(color='black', family='Arial')
+    # --- Plot Radar Chart in Airbnb Red (dotted 95% bounds while approximate) ---
+    def render_topics(radar_df, approx):
+        st.plotly_chart(topic_radar(radar_df), use_container_width=True)
+        if approx:
+            approximate_caption(approx)
+
+    # --- LDA Topic Modeling: a small model on a sample first, the full cached model when ready ---
+    progressive_section(
+        "topics", "topic_mentions", DATASET_KEY, topic_params, len(filtered_df),
+        exact=lambda: topic_table(filtered_df, DATASET_KEY, topic_params),
+        approximate=lambda n: approximate_topic_mentions(filtered_df, n),
+        render=render_topics,
+        initial_rate=1500,
     )
 
-    st.plotly_chart(fig_radar, use_container_width=True)
-
 st.markdown("---")
 
 # --- Word Cloud ---
 st.markdown("## Review Phrase Word‑Cloud")
 
 # --- Neighborhood Filter with "All" option ---
-neighborhoods = sorted(df['neighbourhood'].dropna().unique())
-neighborhood_options = ['All'] + neighborhoods
-
-selected_neighborhoods_wc = st.multiselect(
+selected_neighborhoods_wc = shared_multiselect(
     "Select Neighborhood(s) for Word Cloud:",
-    options=neighborhood_options,
+    None,
+    neighborhood_options,
     default=['All'],
     key="wc_neighborhood_multiselect"
 )
 
 # --- Price Range Filter ---
-min_price = int(df['price'].min())
-max_price = int(df['price'].max())
-
-selected_price_range_wc = st.slider(
+selected_price_range_wc = shared_slider(
     "Select Price Range for Word Cloud:",
+    None,
     min_value=min_price,
     max_value=max_price,
-    value=(0, max_price),
+    default=(0, max_price),
+    key="wc_price_slider",
     step=10,
-    format="$%d",
-    key="wc_price_slider"
+    format="$%d"
 )
 
 # --- Apply Filters ---
-filtered_df_wc = df.copy()
+wc_params = review_params(normalize_selection(selected_neighborhoods_wc, neighborhoods), selected_price_range_wc)
+filtered_df_wc = filter_rows(df, DATASET_KEY, **wc_params)
 
-if 'All' not in selected_neighborhoods_wc:
-    filtered_df_wc = filtered_df_wc[filtered_df_wc['neighbourhood'].isin(selected_neighborhoods_wc)]
+# --- Generate Word Cloud ---
+def sample_wordcloud(n):
+    phrases = phrase_counts(stratified_sample(filtered_df_wc, n))
+    return figure_png(phrase_wordcloud(phrases, width=400, height=200)) if phrases else None
 
 
-filtered_df_wc = filtered_df_wc[
-    (filtered_df_wc['price'] >= selected_price_range_wc[0]) &
-    (filtered_df_wc['price'] <= selected_price_range_wc[1])
-]
+def render_wordcloud(png, approx):
+    if png is None:
+        st.warning("⚠️ Word‑cloud skipped – no adjective–noun phrases found in filtered sample.")
+        return
+    st.image(png, use_container_width=True)
+    if approx:
+        approximate_caption(approx)
 
-# --- Generate Word Cloud ---
-phrases = Counter(
-    p for plist in filtered_df_wc['adj_noun_phrases'].dropna()
-    for p in eval(plist)  # careful: convert string list back to list
-)
 
-if phrases:
-    wc = WordCloud(width=800, height=400, background_color="white", colormap="Reds").generate_from_frequencies(phrases)
-    fig_wc, ax_wc = plt.subplots(figsize=(12, 6))
-    ax_wc.imshow(wc, interpolation="bilinear")
-    ax_wc.axis("off")
-    st.pyplot(fig_wc)
-else:
-    st.warning("⚠️ Word‑cloud skipped – no adjective–noun phrases found in filtered sample.")
+progressive_section(
+    "wordcloud", "wordcloud_png", DATASET_KEY, wc_params, len(filtered_df_wc),
+    exact=lambda: wordcloud_png(filtered_df_wc, DATASET_KEY, wc_params),
+    approximate=sample_wordcloud,
+    render=render_wordcloud,
+)
 
 st.markdown("---")
 
@@ -199,71 +151,52 @@ st.markdown("---")
 st.markdown("## Sentiment vs Rating by Topic")
 
 # --- Neighborhood filter with "All" option ---
-neighborhoods = sorted(df['neighbourhood'].dropna().unique())
-neighborhood_options = ['All'] + neighborhoods
-
-selected_neighborhoods_scatter = st.multiselect(
+selected_neighborhoods_scatter = shared_multiselect(
     "Select Neighborhood(s) for Scatter Plot:",
-    options=neighborhood_options,
+    None,
+    neighborhood_options,
     default=['All'],
     key="scatter_neighborhood_multiselect"
 )
 
 # --- Price Range Slider ---
-min_price = int(df['price'].min())
-max_price = int(df['price'].max())
-
-selected_price_range_scatter = st.slider(
+selected_price_range_scatter = shared_slider(
     "Select Price Range for Scatter Plot:",
+    None,
     min_value=min_price,
     max_value=max_price,
-    value=(0, max_price),
+    default=(0, max_price),
+    key="scatter_price_slider",
     step=10,
-    format="$%d",
-    key="scatter_price_slider"
+    format="$%d"
 )
 
 # --- Apply Filters ---
-if 'All' in selected_neighborhoods_scatter:
-    filtered_df_scatter = df[
-        (df['price'] >= selected_price_range_scatter[0]) &
-        (df['price'] <= selected_price_range_scatter[1])
-    ]
-else:
-    filtered_df_scatter = df[
-        (df['neighbourhood'].isin(selected_neighborhoods_scatter)) &
-        (df['price'] >= selected_price_range_scatter[0]) &
-        (df['price'] <= selected_price_range_scatter[1])
-    ]
-
-# --- Build Scatter Plots ---
-categories = ["cleanliness", "price", "location"]
-sent_cols = [f"sentiment_{k}" for k in categories]
-
-df_sent = filtered_df_scatter.dropna(subset=sent_cols + ["review_scores_rating"])
-
-if not df_sent.empty:
-    fig_scatter, axes = plt.subplots(1, 3, figsize=(18, 5))
-
-    for i, (col, title) in enumerate(zip(sent_cols, [k.capitalize() for k in categories])):
-        ax = axes[i]
-        sns.regplot(
-            data=df_sent,
-            x="review_scores_rating",
-            y=col,
-            scatter_kws={'alpha':0.3, 'color':'#FF5A5F'},
-            line_kws={'color':'firebrick'},
-            ax=ax
-        )
-        ax.set_title(title)
-        ax.set_xlabel("Review Rating (1‑5)")
-        ax.set_ylabel("Sentiment Polarity")
-        ax.grid(True, linestyle="--", alpha=0.6)
-
-    st.pyplot(fig_scatter)
-
-else:
-    st.warning("⚠️ Insufficient data for sentiment scatter plots after applying filters.")
+scatter_params = review_params(normalize_selection(selected_neighborhoods_scatter, neighborhoods), selected_price_range_scatter)
+filtered_df_scatter = filter_rows(df, DATASET_KEY, **scatter_params)
+
+# --- Build Scatter Plots (no bootstrap confidence band while approximate) ---
+def sample_scatter(n):
+    df_sent = sentiment_rows(stratified_sample(filtered_df_scatter, n))
+    return None if df_sent.empty else figure_png(sentiment_scatter(df_sent, ci=None))
+
+
+def render_scatter(png, approx):
+    if png is None:
+        st.warning("⚠️ Insufficient data for sentiment scatter plots after applying filters.")
+        return
+    st.image(png, use_container_width=True)
+    if approx:
+        approximate_caption(approx)
+
+
+progressive_section(
+    "scatter", "sentiment_scatter_png", DATASET_KEY, scatter_params, len(filtered_df_scatter),
+    exact=lambda: sentiment_scatter_png(filtered_df_scatter, DATASET_KEY, scatter_params),
+    approximate=sample_scatter,
+    render=render_scatter,
+    initial_rate=5000,
+)
 
 st.markdown("---")
 
@@ -271,17 +204,11 @@ st.markdown("---")
 
 st.markdown("## Price‑Tier Heatmaps")
 
-# --- Price: Ensure Numeric ---
-if not np.issubdtype(df["price"].dtype, np.number):
-    df["price"] = df["price"].astype(str).str.replace(r"[\$,]", "", regex=True).astype(float)
-
 # --- Neighborhood Filter ---
-neighborhoods = sorted(df['neighbourhood'].dropna().unique())
-neighborhood_options = ['All'] + neighborhoods
-
-selected_neighborhoods_ht = st.multiselect(
+selected_neighborhoods_ht = shared_multiselect(
     "Select Neighborhood(s) for Price-Tier Heatmap: (Tier 1 - Lowest Price Bin)",
-    options=neighborhood_options,
+    None,
+    neighborhood_options,
     default=['All'],
     key="heatmap_neighborhood_multiselect"
 )
@@ -301,47 +228,21 @@ bin_choice = st.select_slider(
 selected_bins = bin_options[bin_choice]
 
 # --- Apply Neighborhood Filter ---
-filtered_df_ht = df.copy()
-
-if 'All' not in selected_neighborhoods_ht:
-    filtered_df_ht = filtered_df_ht[filtered_df_ht['neighbourhood'].isin(selected_neighborhoods_ht)]
-
-# --- Generate Price Bins ---
-bin_labels = [f"Tier {i+1}" for i in range(selected_bins)]
-filtered_df_ht["price_bin"] = pd.qcut(filtered_df_ht["price"], q=selected_bins, labels=bin_labels)
+ht_params = review_params(normalize_selection(selected_neighborhoods_ht, neighborhoods))
+filtered_df_ht = filter_rows(df, DATASET_KEY, **ht_params)
 
-# --- Calculate Metrics ---
-avg_score = filtered_df_ht.groupby("price_bin")["review_scores_rating"].mean().reindex(bin_labels)
-sent_by_price = filtered_df_ht.groupby("price_bin")["sentiment_compound"].mean().reindex(bin_labels)
-
-# --- Color Settings ---
-airbnb_colors = ["#FFCDD2", "#EF9A9A", "#E57373", "#EF5350", "#F44336", "#E53935", "#D32F2F", "#C62828", "#B71C1C"]
+# --- Price Bins, Metrics and Heatmaps ---
+png_rating, png_sentiment = tier_heatmap_pngs(filtered_df_ht, DATASET_KEY, ht_params, selected_bins)
 
 col1, col2 = st.columns(2)
 
 # --- Plot Average Rating ---
 with col1:
-    fig_h1, ax_h1 = plt.subplots(figsize=(4, 5))
-    cmap1 = plt.cm.colors.LinearSegmentedColormap.from_list("AirbnbRed", airbnb_colors)
-    im1 = ax_h1.imshow(avg_score.values.reshape(-1, 1), cmap=cmap1, aspect="auto", origin="lower", vmin=4.6, vmax=5.0)
-    for i, val in enumerate(avg_score):
-        ax_h1.text(0, i, f"{val:.2f}", ha="center", va="center", color="black")
-    ax_h1.set_yticks(range(selected_bins)); ax_h1.set_yticklabels(bin_labels)
-    ax_h1.set_xticks([]); ax_h1.set_title("Average Rating")
-    plt.colorbar(im1, ax=ax_h1, shrink=0.8)
-    st.pyplot(fig_h1)
+    st.image(png_rating, use_container_width=True)
 
 # --- Plot Average Sentiment ---
 with col2:
-    fig_h2, ax_h2 = plt.subplots(figsize=(4, 5))
-    cmap2 = plt.cm.colors.LinearSegmentedColormap.from_list("AirbnbRed", airbnb_colors)
-    im2 = ax_h2.imshow(sent_by_price.values.reshape(-1, 1), cmap=cmap2, aspect="auto", origin="lower", vmin=0.65, vmax=0.85)
-    for i, val in enumerate(sent_by_price):
-        ax_h2.text(0, i, f"{val:.2f}", ha="center", va="center", color="black")
-    ax_h2.set_yticks(range(selected_bins)); ax_h2.set_yticklabels(bin_labels)
-    ax_h2.set_xticks([]); ax_h2.set_title("Average Sentiment")
-    plt.colorbar(im2, ax=ax_h2, shrink=0.8)
-    st.pyplot(fig_h2)
+    st.image(png_sentiment, use_container_width=True)
 
 st.markdown("---")
 
@@ -349,51 +250,183 @@ st.markdown("---")
 st.markdown("## Correlation of Review Sub‑Scores")
 
 # --- Neighborhood Filter ---
-neighborhoods = sorted(df['neighbourhood'].dropna().unique())
-neighborhood_options = ['All'] + neighborhoods
-
-selected_neighborhoods_corr = st.multiselect(
+selected_neighborhoods_corr = shared_multiselect(
     "Select Neighborhood(s) for Correlation Analysis:",
-    options=neighborhood_options,
+    None,
+    neighborhood_options,
     default=['All'],
     key="corr_neighborhood_multiselect"
 )
 
 # --- Apply Neighborhood Filter ---
-filtered_df_corr = df.copy()
-
-if 'All' not in selected_neighborhoods_corr:
-    filtered_df_corr = filtered_df_corr[filtered_df_corr['neighbourhood'].isin(selected_neighborhoods_corr)]
-
-# --- Review Sub-score Columns ---
-score_cols = [
-    "review_scores_accuracy", "review_scores_cleanliness", "review_scores_checkin",
-    "review_scores_communication", "review_scores_location", "review_scores_value", "review_scores_rating"
-]
-
-pretty_labels = [
-    "Description Accuracy", "Cleanliness", "Smooth Checkin",
-    "Host Communication", "Location", "Value", "Overall Rating"
-]
-
-available_cols = [c for c in score_cols if c in filtered_df_corr.columns]
-
-# --- Plot Correlation Heatmap ---
-if len(available_cols) >= 2:
-    corr = filtered_df_corr[available_cols].corr()
-    fig_corr, ax_corr = plt.subplots(figsize=(10, 8))
-    cax = ax_corr.matshow(corr, cmap="Reds", vmin=0, vmax=1)
-    fig_corr.colorbar(cax, ax=ax_corr)
-    ax_corr.set_xticks(range(len(available_cols)))
-    ax_corr.set_xticklabels(pretty_labels, rotation=45, ha="left")
-    ax_corr.set_yticks(range(len(available_cols)))
-    ax_corr.set_yticklabels(pretty_labels)
-    ax_corr.set_title("Correlation Matrix of Review Sub-Scores", pad=20)
-    st.pyplot(fig_corr)
+corr_params = review_params(normalize_selection(selected_neighborhoods_corr, neighborhoods))
+filtered_df_corr = filter_rows(df, DATASET_KEY, **corr_params)
+
+# --- Plot Correlation Heatmap of Review Sub-scores ---
+png_corr = correlation_png(filtered_df_corr, DATASET_KEY, corr_params)
+if png_corr is not None:
+    st.image(png_corr, use_container_width=True)
 else:
     st.info("⚠️ Not enough detailed score columns to compute correlations after applying filters.")
 
 st.markdown("---")
 
+# --- Full-Text Review Search ---
+st.markdown("## Search Reviews")
+
+search_query = st.text_input(
+    'Search review text (quotes for exact phrases, e.g. "bed bugs" elevator):',
+    key="search_query"
+)
+
+col1, col2 = st.columns(2)
+with col1:
+    selected_neighborhoods_search = shared_multiselect(
+        "Select Neighborhood(s) to Search:",
+        None,
+        neighborhood_options,
+        default=['All'],
+        key="search_neighborhood_multiselect"
+    )
+with col2:
+    selected_price_range_search = shared_slider(
+        "Select Price Range to Search:",
+        None,
+        min_value=min_price,
+        max_value=max_price,
+        default=(0, max_price),
+        key="search_price_slider",
+        step=10,
+        format="$%d"
+    )
+
+RESULTS_PER_PAGE = 10
+
+if 'review_content' not in df.columns:
+    st.info("⚠️ Review text is not available in this dataset.")
+elif search_query.strip():
+    # --- Ranked hits (BM25) within the neighbourhood / price filters ---
+    search_index = load_text_index(DATASET_KEY, df)
+    search_params = review_params(normalize_selection(selected_neighborhoods_search, neighborhoods), selected_price_range_search)
+    candidates = filter_positions(df, DATASET_KEY, **search_params)
+
+    start = time.perf_counter()
+    hits, scores = search_index.search(search_query, candidates)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if len(hits) == 0:
+        st.warning("⚠️ No reviews match this search for the selected filters.")
+    else:
+        n_pages = -(-len(hits) // RESULTS_PER_PAGE)
+        # Back to the first page for a new query or filters
+        search_signature = (search_query.strip(), search_params)
+        if st.session_state.get("search_signature") != search_signature or st.session_state.get("search_page", 1) > n_pages:
+            st.session_state["search_page"] = 1
+        st.session_state["search_signature"] = search_signature
+        page = st.number_input("Page:", min_value=1, max_value=n_pages, step=1, key="search_page")
+        st.caption(f"{len(hits):,} matching reviews · page {page} of {n_pages} · ranked by BM25 in {elapsed_ms:.0f} ms")
+
+        page_slice = slice((page - 1) * RESULTS_PER_PAGE, page * RESULTS_PER_PAGE)
+        for position, score in zip(hits[page_slice], scores[page_slice]):
+            row = df.iloc[position]
+            st.markdown(
+                f"**{escape_markdown(str(row.get('listing_name', 'Listing')))}** · "
+                f"{escape_markdown(str(row['neighbourhood']))} · \\${row['price']:,.0f} · "
+                f"{row.get('review_date', '')} · score {score:.2f}"
+            )
+            st.markdown("> " + snippet(row['review_content'], search_query))
+
+st.markdown("---")
+
+# --- Custom Aspect Sentiment ---
+st.markdown("## Custom Aspect Sentiment")
+
+aspect_keywords = st.text_input(
+    "Define an aspect by keywords or phrases (comma-separated):",
+    placeholder="e.g. wifi, internet, wi-fi",
+    key="aspect_keywords"
+)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    selected_neighborhoods_aspect = shared_multiselect(
+        "Select Neighborhood(s) for Aspect:",
+        None,
+        neighborhood_options,
+        default=['All'],
+        key="aspect_neighborhood_multiselect"
+    )
+with col2:
+    selected_price_range_aspect = shared_slider(
+        "Select Price Range for Aspect:",
+        None,
+        min_value=min_price,
+        max_value=max_price,
+        default=(0, max_price),
+        key="aspect_price_slider",
+        step=10,
+        format="$%d"
+    )
+with col3:
+    aspect_level = st.radio("Compare:", ["Listings", "Neighborhoods"], horizontal=True, key="aspect_level")
+
+aspect = aspect_definition(aspect_keywords)
+
+if 'review_content' not in df.columns:
+    st.info("⚠️ Review text is not available in this dataset.")
+elif aspect:
+    # --- Score only the sentences mentioning the aspect (cached per definition) ---
+    try:
+        aspect_reviews = aspect_table(df, load_text_index(DATASET_KEY, df), DATASET_KEY, aspect)
+    except ImportError:
+        aspect_reviews = None
+        st.info("⚠️ Custom aspects need the `vaderSentiment` package (`pip install vaderSentiment`).")
+
+    if aspect_reviews is not None:
+        aspect_params = review_params(normalize_selection(selected_neighborhoods_aspect, neighborhoods), selected_price_range_aspect)
+        aspect_reviews = apply_filters(aspect_reviews, **aspect_params)
+
+        if aspect_reviews.empty:
+            st.warning("⚠️ No reviews mention this aspect for the selected filters.")
+        else:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Reviews Mentioning", f"{len(aspect_reviews):,}")
+            col2.metric("Matching Sentences", f"{int(aspect_reviews['aspect_mentions'].sum()):,}")
+            col3.metric("Average Aspect Sentiment", f"{aspect_reviews['aspect_sentiment'].mean():.2f}")
+
+            # --- Aspect sentiment against rating ---
+            if aspect_level == "Listings":
+                by_group = aspect_by(aspect_reviews, 'listing_id')
+                hover = [c for c in ['listing_name', 'neighbourhood', 'reviews'] if c in by_group.columns]
+                text = None
+            else:
+                by_group = aspect_by(aspect_reviews, 'neighbourhood')
+                hover = ['reviews']
+                text = 'neighbourhood'
+
+            fig_aspect = px.scatter(
+                by_group,
+                x='review_scores_rating',
+                y='aspect_sentiment',
+                size='aspect_mentions',
+                text=text,
+                hover_data=hover,
+                color_discrete_sequence=[AIRBNB_RED],
+                labels={'review_scores_rating': 'Average Review Rating', 'aspect_sentiment': 'Aspect Sentiment',
+                        'aspect_mentions': 'Mentions'}
+            )
+            fig_aspect.update_traces(textposition="top center")
+            fig_aspect.update_layout(
+                template='plotly_white',
+                height=550,
+                font=dict(color='black', family='Arial'),
+            )
+            st.plotly_chart(fig_aspect, use_container_width=True)
+            st.caption("Sentiment of only the sentences mentioning the aspect keywords (lexicon score, −1 to 1).")
+else:
+    st.caption("Enter keywords to score the reviews that mention them (the review index is built on first use).")
+
+st.markdown("---")
+
 # --- Footer ---
 st.caption("© 2025 · Columbia University")
\ No newline at end of file
@@ -0,0 +1,123 @@
+import os
+import streamlit as st
+import plotly.express as px
+from utils.aggregates import monthly_table, rollup
+from utils.data import dataset_version
+from utils.filters import ALL, city_selector, shared_multiselect
+from utils.store import available_partitions, city_partitions
+
+st.set_page_config(page_title="Review Trends", page_icon="📈", layout="wide")
+
+# --- City / borough (only their data partitions are loaded) ---
+city, boroughs = city_selector(available_partitions())
+
+st.title(f"📈 {', '.join(boroughs) if boroughs else city} Airbnb Review Trends")
+st.markdown("---")
+
+# --- Load the stored monthly aggregate tables (refreshed by `python -m utils.aggregates`) ---
+@st.cache_resource(show_spinner="Loading monthly review aggregates…")
+def load_monthly_table(partitions, source_versions):
+    return monthly_table(partitions)
+
+
+partitions = city_partitions(city, boroughs)
+monthly, stale = load_monthly_table(
+    partitions,
+    tuple(dataset_version(p.nlp_path) for p in partitions if os.path.exists(p.nlp_path)),
+)
+
+if stale:
+    st.info(
+        f"ℹ️ The monthly review aggregates of {', '.join(p.borough for p in stale)} are missing or "
+        "out of date. Run `python -m utils.aggregates` to refresh them."
+    )
+
+# --- Airbnb pink/red shades ---
+airbnb_colors = ['#FF5A5F', '#D32F2F', '#E57373', '#B71C1C', '#F44336', '#FFCDD2', '#EF9A9A', '#C62828']
+
+# =========================
+# Filters
+# =========================
+
+neighborhoods = sorted(monthly['neighbourhood'].unique())
+room_types = sorted(monthly['room_type'].unique())
+
+col1, col2 = st.columns(2)
+with col1:
+    selected_neighborhoods = shared_multiselect(
+        "Select Neighborhood(s):",
+        'neighbourhoods',
+        [ALL] + neighborhoods,
+        default=[ALL],
+        key="trend_neighborhood_multiselect"
+    )
+with col2:
+    selected_room_types = shared_multiselect(
+        "Select Room Type(s):",
+        'room_types',
+        [ALL] + room_types,
+        default=[ALL],
+        key="trend_room_type_multiselect"
+    )
+
+col1, col2 = st.columns(2)
+with col1:
+    compare_by = st.radio(
+        "Compare by:",
+        ["Overall", "Neighborhood", "Room Type"],
+        horizontal=True
+    )
+with col2:
+    window = st.select_slider(
+        "Rolling window (months):",
+        options=[1, 3, 6, 12],
+        value=3
+    )
+
+# --- Apply filters to the aggregate table ---
+table = monthly
+if ALL not in selected_neighborhoods:
+    table = table[table['neighbourhood'].isin(selected_neighborhoods)]
+if ALL not in selected_room_types:
+    table = table[table['room_type'].isin(selected_room_types)]
+
+by = {"Overall": None, "Neighborhood": 'neighbourhood', "Room Type": 'room_type'}[compare_by]
+
+st.markdown("---")
+
+if table.empty:
+    st.warning("⚠️ No reviews found for the selected filters.")
+else:
+    trend = rollup(table, by=by, window=window)
+    color = by if by else None
+    labels = {'month': 'Month', 'neighbourhood': 'Neighborhood', 'room_type': 'Room Type'}
+    window_note = f" ({window}-month rolling)" if window > 1 else ""
+
+    charts = [
+        ("Review Volume", 'review_count', "Number of Reviews"),
+        ("Average Review Sentiment", 'sentiment_mean', "Mean Compound Sentiment"),
+        ("Average Rating", 'rating_mean', "Mean Rating (1–5)"),
+    ]
+
+    for title, y, y_title in charts:
+        st.markdown(f"## {title}{window_note}")
+        fig = px.line(
+            trend,
+            x='month',
+            y=y,
+            color=color,
+            color_discrete_sequence=airbnb_colors,
+            labels={**labels, y: y_title}
+        )
+        fig.update_layout(
+            template='plotly_white',
+            height=450,
+            font=dict(color='black', family='Arial'),
+            legend_title_text=compare_by if by else None,
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+st.markdown("---")
+
+# --- Footer ---
+st.caption("© 2025 · Columbia University")
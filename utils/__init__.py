@@ -0,0 +1 @@
+"""Shared helpers for the Airbnb Streamlit pages."""
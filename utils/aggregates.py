@@ -0,0 +1,227 @@
+"""Monthly review aggregates (month x neighbourhood x room type).
+
+The table stores additive statistics (counts and sums) so that it can be
+re-aggregated to any coarser grouping or rolling window without touching the
+raw review rows, and refreshed month by month when the reviews change.
+
+Each city / borough partition keeps its own table next to its review file;
+a city's trends concatenate the tables of its partitions. Refresh every
+stored table from the command line with::
+
+    python -m utils.aggregates
+
+The app only reads the stored tables and never parses the review files; a
+table that is missing or older than its review file (compared by content,
+not modification time) is reported so the command above can be run.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.data import DATA_DIR, NLP_PATH, dataset_version, discover_partitions, read_nlp
+
+MONTHLY_AGG_FILE = "review_monthly_agg.csv"
+MONTHLY_AGG_PATH = os.path.join(DATA_DIR, MONTHLY_AGG_FILE)
+
+KEYS = ['month', 'neighbourhood', 'room_type']
+# metric -> source column; stored as <metric>_sum / <metric>_count
+METRICS = {
+    'sentiment': 'sentiment_compound',
+    'rating': 'review_scores_rating',
+}
+SUM_COLS = ['review_count'] + [f"{m}_{s}" for m in METRICS for s in ("sum", "count")]
+# Columns whose changes must reach the aggregate
+FINGERPRINT_COLS = ['review_id', 'review_date', 'neighbourhood', 'room_type'] + list(METRICS.values())
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + ".meta.json"
+
+
+def source_digest(path, chunk_size=1 << 20):
+    """Content version of a review file (size and SHA-256), unaffected by checkouts or touches."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            sha.update(block)
+    return f"{os.path.getsize(path)}-{sha.hexdigest()}"
+
+
+def monthly_stats(reviews):
+    """Additive monthly statistics for a batch of review rows."""
+    dates = pd.to_datetime(reviews['review_date'])
+    frame = pd.DataFrame({
+        'month': dates.dt.to_period('M').dt.to_timestamp(),
+        'neighbourhood': reviews['neighbourhood'],
+        'room_type': reviews['room_type'],
+        'review_count': 1,
+    })
+    for metric, col in METRICS.items():
+        frame[f"{metric}_sum"] = reviews[col].fillna(0.0)
+        frame[f"{metric}_count"] = reviews[col].notna().astype(int)
+    return frame.groupby(KEYS, as_index=False)[SUM_COLS].sum()
+
+
+def month_fingerprints(reviews):
+    """Row count and an order-independent content hash of each month's reviews."""
+    dates = pd.to_datetime(reviews['review_date'])
+    reviews = reviews[dates.notna().to_numpy()]  # undated reviews belong to no month
+    months = dates.dropna().dt.strftime('%Y-%m').to_numpy()
+    cols = [c for c in FINGERPRINT_COLS if c in reviews.columns]
+    hashes = pd.util.hash_pandas_object(reviews[cols], index=False).to_numpy()
+    order = np.argsort(months, kind="stable")
+    months, hashes = months[order], hashes[order]
+    starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]]) if len(months) else np.array([], dtype=int)
+    sums = np.add.reduceat(hashes, starts) if len(starts) else hashes[:0]  # uint64, wraps around
+    counts = np.diff(np.r_[starts, len(months)])
+    return {m: [int(n), int(h)] for m, n, h in zip(months[starts], counts, sums)}
+
+
+class MonthlyReviewAggregate:
+    """Monthly aggregate table plus a fingerprint of the reviews in each month.
+
+    A refresh compares the fingerprints (row count and content hash per
+    month) of the new source with the stored ones and recomputes only the
+    months that differ, so new, late, back-dated, edited or deleted reviews
+    are all picked up without re-aggregating unchanged months.
+    """
+
+    def __init__(self, table=None, fingerprints=None, source_version=None, source_stat=None):
+        self.table = table if table is not None else pd.DataFrame(columns=KEYS + SUM_COLS)
+        self.fingerprints = dict(fingerprints or {})
+        # Content digest of the source at the last refresh (``source_digest``),
+        # plus its cheap stat-based version to skip re-hashing an untouched file
+        self.source_version = source_version
+        self.source_stat = source_stat
+
+    def refresh(self, reviews):
+        """Recompute the months whose reviews changed; returns those months."""
+        fingerprints = month_fingerprints(reviews)
+        changed = sorted(
+            m for m in fingerprints.keys() | self.fingerprints.keys()
+            if fingerprints.get(m) != self.fingerprints.get(m)
+        )
+        if not changed:
+            return changed
+
+        months = pd.to_datetime(reviews['review_date']).dt.strftime('%Y-%m')
+        stats = monthly_stats(reviews[months.isin(changed).to_numpy()])
+        if self.fingerprints:
+            kept = self.table[~pd.to_datetime(self.table['month']).dt.strftime('%Y-%m').isin(changed)]
+        else:
+            kept = self.table.iloc[:0]  # nothing known about the stored table: rebuild it
+        self.table = pd.concat([kept, stats], ignore_index=True).sort_values(KEYS, ignore_index=True)
+        self.fingerprints = fingerprints
+        return changed
+
+    def save(self, path=MONTHLY_AGG_PATH):
+        self.table.to_csv(path, index=False)
+        with open(_meta_path(path), "w") as f:
+            json.dump({
+                'fingerprints': self.fingerprints,
+                'source_version': self.source_version,
+                'source_stat': self.source_stat,
+            }, f)
+
+    @classmethod
+    def load(cls, path=MONTHLY_AGG_PATH):
+        """Stored aggregate, or an empty one if it has not been built yet."""
+        if not os.path.exists(path):
+            return cls()
+        table = pd.read_csv(path, parse_dates=['month'])
+        meta = {}
+        if os.path.exists(_meta_path(path)):
+            with open(_meta_path(path)) as f:
+                meta = json.load(f)
+        return cls(table, meta.get('fingerprints'), meta.get('source_version'), meta.get('source_stat'))
+
+    def is_current(self, source):
+        """Whether the table was built from the current contents of ``source``."""
+        if self.source_version is None:
+            return False
+        if self.source_stat == dataset_version(source):
+            return True
+        return self.source_version == source_digest(source)
+
+
+def refresh_monthly_aggregate(source=NLP_PATH, path=MONTHLY_AGG_PATH):
+    """Bring the stored aggregate up to date with ``source`` and write it back.
+
+    Only reads the raw reviews when the source content has changed since the
+    stored refresh, and only recomputes the months that changed.
+    """
+    agg = MonthlyReviewAggregate.load(path)
+    stat = dataset_version(source)
+    if agg.source_stat != stat:
+        version = source_digest(source)
+        if agg.source_version != version:
+            agg.refresh(read_nlp(source))
+            agg.source_version = version
+        agg.source_stat = stat
+        agg.save(path)
+    return agg
+
+
+def _aggregate_path(partition):
+    return os.path.join(partition.directory, MONTHLY_AGG_FILE)
+
+
+def partition_aggregate(partition):
+    """Refreshed aggregate of one partition, stored in the partition's directory."""
+    return refresh_monthly_aggregate(partition.nlp_path, _aggregate_path(partition))
+
+
+def monthly_table(partitions):
+    """Stored monthly table over several partitions (their neighbourhoods never overlap).
+
+    Returns the table and the partitions whose stored table is missing or
+    older than their review file; those are left out or served as stored.
+    """
+    tables, stale = [], []
+    for partition in partitions:
+        if not os.path.exists(partition.nlp_path):
+            continue
+        agg = MonthlyReviewAggregate.load(_aggregate_path(partition))
+        if not agg.is_current(partition.nlp_path):
+            stale.append(partition)
+        if not agg.table.empty:
+            tables.append(agg.table)
+    if not tables:
+        return MonthlyReviewAggregate().table, stale
+    return pd.concat(tables, ignore_index=True), stale
+
+
+def rollup(table, by=None, window=1):
+    """Re-aggregate the monthly table by month (and ``by``) with a rolling window.
+
+    Means are computed from rolled-up sums and counts, so they stay correctly
+    weighted by review volume.
+    """
+    keys = ['month'] + ([by] if by else [])
+    out = table.groupby(keys, as_index=False)[SUM_COLS].sum().sort_values(keys)
+
+    if window > 1:
+        def roll(group):
+            # fill missing months with zeros so the window spans calendar months
+            monthly = group.set_index('month')[SUM_COLS].asfreq('MS', fill_value=0)
+            return monthly.rolling(window, min_periods=1).sum()
+
+        if by:
+            out = out.groupby(by)[['month'] + SUM_COLS].apply(roll).reset_index()
+        else:
+            out = roll(out).reset_index()
+
+    for metric in METRICS:
+        out[f"{metric}_mean"] = out[f"{metric}_sum"] / out[f"{metric}_count"].where(out[f"{metric}_count"] > 0)
+    return out
+
+
+if __name__ == "__main__":
+    for city, partitions in discover_partitions().items():
+        for partition in partitions:
+            if os.path.exists(partition.nlp_path):
+                agg = partition_aggregate(partition)
+                print(f"{city} / {partition.borough}: {len(agg.table)} aggregate rows over {len(agg.fingerprints)} months")
@@ -0,0 +1,310 @@
+"""Headless JSON / Arrow query API over the same aggregates the pages show.
+
+Runs standalone against the local data files (no Streamlit needed)::
+
+    python -m utils.api --port 8600
+
+Endpoints (all GET; list parameters may be repeated or comma-separated):
+
+- ``/v1/average-price``       ``neighbourhood``, ``room_type``
+- ``/v1/price-histogram``     ``neighbourhood``, ``room_type``, ``price_min``, ``price_max``, ``bins``
+- ``/v1/topic-shares``        ``neighbourhood``, ``price_min``, ``price_max``, ``topics``
+- ``/v1/score-correlations``  ``neighbourhood``
+- ``/v1/datasets``            dataset versions
+
+Responses are JSON records unless ``format=arrow`` is given or the client
+accepts ``application/vnd.apache.arrow.stream`` (needs ``pyarrow``). Every
+response carries an ``ETag`` derived from the dataset version and the
+normalized query, and ``If-None-Match`` is answered with ``304`` without
+recomputing anything. Errors are JSON ``{"error": ...}``: 400 for bad
+parameters, 422 when the matching data can't support the query, 500 otherwise.
+"""
+import argparse
+import hashlib
+import io
+import json
+import threading
+import traceback
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from utils.data import LISTINGS_PATH, NLP_PATH, dataset_version, read_nlp, read_reviews
+from utils.queries import (
+    apply_filters, average_price, price_histogram, score_correlations, topic_distribution,
+)
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+JSON_MIME = "application/json"
+CACHE_CONTROL = "public, max-age=300"
+
+
+class QueryError(ValueError):
+    """Bad query parameters; reported to the client as 400."""
+
+
+class DataError(ValueError):
+    """Valid parameters, but the matching data can't support the query; reported as 422."""
+
+
+# =========================
+# Datasets
+# =========================
+
+class Datasets:
+    """Lazily loaded datasets, reloaded when the file on disk changes."""
+
+    SOURCES = {
+        'reviews': (LISTINGS_PATH, read_reviews),
+        'nlp': (NLP_PATH, read_nlp),
+    }
+
+    def __init__(self):
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def version(self, name):
+        return dataset_version(self.SOURCES[name][0])
+
+    def get(self, name):
+        path, reader = self.SOURCES[name]
+        version = dataset_version(path)
+        with self._lock:
+            cached = self._frames.get(name)
+            if cached is None or cached[0] != version:
+                cached = (version, reader(path))
+                self._frames[name] = cached
+        return cached[1]
+
+
+# =========================
+# Query parameters
+# =========================
+
+def _list_param(params, name):
+    values = [v for raw in params.get(name, []) for v in raw.split(",") if v]
+    return tuple(sorted(set(values))) or None
+
+
+def _number_param(params, name, cast=float, default=None):
+    if name not in params:
+        return default
+    try:
+        return cast(params[name][-1])
+    except ValueError:
+        raise QueryError(f"'{name}' must be a number")
+
+
+def _price_range(params):
+    low = _number_param(params, 'price_min')
+    high = _number_param(params, 'price_max')
+    if low is None and high is None:
+        return None
+    return (low if low is not None else float('-inf'), high if high is not None else float('inf'))
+
+
+# =========================
+# Queries: (dataset, normalized params, compute)
+# =========================
+
+def _average_price(params):
+    filters = dict(neighbourhoods=_list_param(params, 'neighbourhood'), room_types=_list_param(params, 'room_type'))
+    return 'reviews', filters, lambda df: average_price(apply_filters(df, **filters))
+
+
+def _price_histogram(params):
+    filters = dict(
+        neighbourhoods=_list_param(params, 'neighbourhood'),
+        room_types=_list_param(params, 'room_type'),
+        price_range=_price_range(params),
+    )
+    bins = _number_param(params, 'bins', int, 50)
+    if not 1 <= bins <= 500:
+        raise QueryError("'bins' must be between 1 and 500")
+
+    def compute(df):
+        return price_histogram(apply_filters(df, **filters), bins=bins)
+    return 'reviews', {**filters, 'bins': bins}, compute
+
+
+def _topic_shares(params):
+    filters = dict(neighbourhoods=_list_param(params, 'neighbourhood'), price_range=_price_range(params))
+    topics = _number_param(params, 'topics', int, 5)
+    if not 2 <= topics <= 9:
+        raise QueryError("'topics' must be between 2 and 9")
+
+    def compute(df):
+        filtered = apply_filters(df, **filters)
+        if filtered.empty:
+            raise DataError("no reviews match the filters")
+        shares = topic_distribution(filtered, n_topics=topics)
+        return shares.assign(Share=shares['Mentions'] / shares['Mentions'].sum())
+    return 'nlp', {**filters, 'topics': topics}, compute
+
+
+def _score_correlations(params):
+    filters = dict(neighbourhoods=_list_param(params, 'neighbourhood'))
+
+    def compute(df):
+        corr, labels = score_correlations(apply_filters(df, **filters))
+        if corr is None:
+            raise DataError("not enough review sub-score columns")
+        return corr.set_axis(labels, axis=0).set_axis(labels, axis=1).rename_axis('score').reset_index()
+    return 'nlp', filters, compute
+
+
+QUERIES = {
+    '/v1/average-price': _average_price,
+    '/v1/price-histogram': _price_histogram,
+    '/v1/topic-shares': _topic_shares,
+    '/v1/score-correlations': _score_correlations,
+}
+
+
+def make_etag(version, path, params, fmt):
+    """Strong ETag for a query result: dataset version + normalized query + format."""
+    canonical = json.dumps([version, path, params, fmt], sort_keys=True, default=str)
+    return '"' + hashlib.sha256(canonical.encode()).hexdigest()[:32] + '"'
+
+
+# =========================
+# Response encoding and cache
+# =========================
+
+def encode(frame, fmt):
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue(), ARROW_MIME
+    body = frame.to_json(orient="records", double_precision=6)
+    return body.encode(), JSON_MIME
+
+
+class ResponseCache:
+    """Small thread-safe LRU of encoded response bodies keyed by ETag."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# =========================
+# HTTP server
+# =========================
+
+class QueryHandler(BaseHTTPRequestHandler):
+    server_version = "AirbnbQueryAPI/1.0"
+    datasets = None
+    cache = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type=JSON_MIME, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", CACHE_CONTROL)
+            self.send_header("Vary", "Accept")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and status != HTTPStatus.NOT_MODIFIED:
+            self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({'error': message}).encode())
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+
+        if url.path == "/v1/datasets":
+            try:
+                versions = {name: self.datasets.version(name) for name in Datasets.SOURCES}
+            except Exception:
+                traceback.print_exc()
+                return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, "internal error")
+            return self._send(HTTPStatus.OK, json.dumps(versions).encode())
+
+        query = QUERIES.get(url.path)
+        if query is None:
+            return self._error(HTTPStatus.NOT_FOUND, f"unknown endpoint {url.path}")
+
+        fmt = params.get('format', [None])[-1]
+        if fmt is None:
+            fmt = "arrow" if ARROW_MIME in self.headers.get("Accept", "") else "json"
+        if fmt not in ("json", "arrow"):
+            return self._error(HTTPStatus.BAD_REQUEST, "'format' must be json or arrow")
+
+        try:
+            dataset, normalized, compute = query(params)
+            etag = make_etag(self.datasets.version(dataset), url.path, normalized, fmt)
+
+            if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+                return self._send(HTTPStatus.NOT_MODIFIED, etag=etag)
+
+            cached = self.cache.get(etag)
+            if cached is None:
+                cached = encode(compute(self.datasets.get(dataset)), fmt)
+                self.cache.put(etag, cached)
+        except QueryError as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e))
+        except ImportError:
+            return self._error(HTTPStatus.NOT_ACCEPTABLE, "Arrow output needs pyarrow installed")
+        except (ValueError, ZeroDivisionError) as e:
+            # valid parameters, but the matching rows can't support the computation
+            # (DataError, or e.g. too few reviews for the topic model's vocabulary)
+            return self._error(HTTPStatus.UNPROCESSABLE_ENTITY, f"cannot compute this query for the matching data: {e}")
+        except Exception:
+            traceback.print_exc()
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, "internal error")
+
+        body, content_type = cached
+        self._send(HTTPStatus.OK, body, content_type, etag)
+
+
+def make_server(host="127.0.0.1", port=8600):
+    handler = type("Handler", (QueryHandler,), {'datasets': Datasets(), 'cache': ResponseCache()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Airbnb aggregate queries over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port)
+    print(f"Serving aggregate queries on http://{args.host}:{args.port}/v1/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""User-defined aspect sentiment, computed on demand through the review index.
+
+An aspect is a set of keywords or phrases (``"wifi, internet, check-in"``).
+Reviews mentioning any of them are found through the ``TextIndex``
+postings, only their matching sentences are split out, and those are scored
+in batches with a VADER-style lexicon model: one sparse matrix product per
+batch instead of a Python loop per sentence. Negations (``"not clean"``) are
+handled by scoring negator–word bigrams.
+
+The lexicon comes from the ``vaderSentiment`` package.
+"""
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from utils.text_index import TOKEN_RE, clause_regex, tokenize
+
+SENTENCE_RE = r"(?<=[.!?])\s+|\n+"
+# Review columns kept in the (cached) per-review aspect table
+REVIEW_COLUMNS = ['listing_id', 'listing_name', 'neighbourhood', 'room_type', 'price', 'review_scores_rating']
+BATCH_SIZE = 50000
+# VADER's normalization constant and negation scalar
+VADER_ALPHA = 15
+NEGATION_SCALAR = -0.74
+NEGATORS = [
+    "not", "no", "never", "none", "nothing", "nowhere", "neither", "nor", "without", "hardly",
+    "isn't", "wasn't", "aren't", "weren't", "don't", "doesn't", "didn't", "can't", "couldn't",
+    "won't", "wouldn't", "shouldn't", "hasn't", "haven't", "hadn't",
+]
+
+
+def aspect_definition(keywords):
+    """Normalized aspect: sorted unique token tuples of comma-separated keywords.
+
+    Equal definitions (up to case, order and punctuation) share a cache entry.
+    """
+    clauses = {tuple(tokenize(k)) for k in keywords.split(",")}
+    return tuple(sorted(c for c in clauses if c))
+
+
+class SentimentScorer:
+    """Lexicon sentiment for many sentences at once.
+
+    Each sentence's valence is the sum of its lexicon words (a negated word
+    counts ``NEGATION_SCALAR`` times its valence), normalized to [-1, 1] like
+    VADER's compound score.
+    """
+
+    def __init__(self, lexicon, negators=NEGATORS):
+        words = {w: v for w, v in lexicon.items() if re.fullmatch(TOKEN_RE, w)}
+        weights = dict(words)
+        for negator in negators:
+            for word, valence in words.items():
+                # the unigram still counts, so the bigram cancels it and adds the negated valence
+                weights[f"{negator} {word}"] = (NEGATION_SCALAR - 1) * valence
+        self.vectorizer = CountVectorizer(
+            vocabulary=list(weights), token_pattern=TOKEN_RE, ngram_range=(1, 2)
+        )
+        self.weights = np.fromiter(weights.values(), dtype=float, count=len(weights))
+
+    def score(self, sentences, batch_size=BATCH_SIZE):
+        sentences = list(sentences)
+        scores = np.empty(len(sentences))
+        for start in range(0, len(sentences), batch_size):
+            counts = self.vectorizer.transform(sentences[start:start + batch_size])
+            raw = counts @ self.weights
+            scores[start:start + batch_size] = raw / np.sqrt(raw ** 2 + VADER_ALPHA)
+        return scores
+
+
+@functools.lru_cache(maxsize=1)
+def default_scorer():
+    """Scorer over the VADER lexicon; raises ``ImportError`` without vaderSentiment."""
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentScorer(SentimentIntensityAnalyzer().lexicon)
+
+
+# =========================
+# Aspect sentiment tables
+# =========================
+
+def aspect_sentences(texts, index, clauses):
+    """Sentences mentioning the aspect, as a frame of ``doc`` (row position) and ``sentence``."""
+    docs = index.docs_matching_any(clauses)
+    texts = pd.Series(np.asarray(texts, dtype=object)[docs], index=docs).fillna("").astype(str)
+    sentences = texts.str.split(SENTENCE_RE, regex=True).explode()
+    mentions = sentences[sentences.str.contains(clause_regex(clauses), na=False)]
+    return pd.DataFrame({'doc': mentions.index.to_numpy(dtype=np.int64), 'sentence': mentions.to_numpy()})
+
+
+def aspect_sentiment(reviews, index, clauses, scorer=None):
+    """Per-review aspect sentiment: mean score of the review's matching sentences.
+
+    Returns ``REVIEW_COLUMNS`` of the matching reviews with
+    ``aspect_sentiment`` and ``aspect_mentions`` added (empty if nothing
+    matches).
+    """
+    mentions = aspect_sentences(reviews['review_content'], index, clauses)
+    reviews = reviews[[c for c in REVIEW_COLUMNS if c in reviews.columns]]
+    if mentions.empty:
+        return reviews.iloc[:0].assign(aspect_sentiment=pd.Series(dtype=float), aspect_mentions=pd.Series(dtype=int))
+
+    scorer = scorer or default_scorer()
+    per_review = (
+        mentions.assign(score=scorer.score(mentions['sentence']))
+        .groupby('doc')['score'].agg(['mean', 'size'])
+    )
+    return reviews.iloc[per_review.index.to_numpy()].assign(
+        aspect_sentiment=per_review['mean'].to_numpy(),
+        aspect_mentions=per_review['size'].to_numpy(),
+    )
+
+
+def aspect_by(table, by):
+    """Aspect sentiment and rating averaged per ``by`` group (``listing_id`` or ``neighbourhood``)."""
+    columns = {'aspect_sentiment': 'mean', 'review_scores_rating': 'mean', 'aspect_mentions': 'sum'}
+    grouped = table.groupby(by).agg(columns).reset_index()
+    grouped['reviews'] = table.groupby(by).size().to_numpy()
+    if by == 'listing_id':
+        names = table.drop_duplicates('listing_id').set_index('listing_id')
+        for col in ['listing_name', 'neighbourhood']:
+            if col in names.columns:
+                grouped[col] = grouped['listing_id'].map(names[col])
+    return grouped
@@ -0,0 +1,280 @@
+"""Figure builders for the page charts.
+
+Each function takes already-filtered / aggregated data and returns a Plotly
+or Matplotlib figure, so the pages and the batch report job draw identical
+charts.
+"""
+import io
+
+import matplotlib.pyplot as plt
+import plotly.express as px
+import plotly.graph_objects as go
+import seaborn as sns
+from matplotlib.figure import Figure
+from wordcloud import WordCloud
+
+# --- Airbnb pink/red shades ---
+AIRBNB_COLORS = ['#FFCDD2', '#E57373', '#F44336', '#D32F2F']
+AIRBNB_REDS = ["#FFCDD2", "#EF9A9A", "#E57373", "#EF5350", "#F44336", "#E53935", "#D32F2F", "#C62828", "#B71C1C"]
+AIRBNB_RED = "#FF5A5F"
+
+
+def figure_png(fig, dpi=200):
+    """Render a Matplotlib figure to PNG bytes (as ``st.pyplot`` does) and close it."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+# =========================
+# Price Insights
+# =========================
+
+def average_price_bar(avg_price):
+    fig = px.bar(
+        avg_price,
+        x='neighbourhood',
+        y='price',
+        color='room_type',
+        barmode='group',
+        color_discrete_sequence=AIRBNB_COLORS,
+        labels={'price': 'Average Price (USD)', 'neighbourhood': 'Neighborhood'}
+    )
+
+    fig.update_layout(
+        template='plotly_white',
+        width=1000,
+        height=600,
+        font=dict(color='black', family='Arial'),
+        legend_title_text="Room Type",
+        legend_title_font=dict(color='black', size=16),
+        legend_font=dict(color='black', size=14),
+        xaxis_tickangle=-30,
+        margin=dict(b=150),
+    )
+    return fig
+
+
+def price_histogram_chart(df):
+    fig = px.histogram(
+        df,
+        x='price',
+        nbins=50,
+        color_discrete_sequence=[AIRBNB_COLORS[2]],  # Darker pink for bars
+        labels={'price': 'Listing Price (USD)'}
+    )
+
+    fig.update_layout(
+        template='plotly_white',
+        width=1000,
+        height=600,
+        title_text=None,
+        font=dict(color='black', family='Arial'),
+        xaxis_title="Price (USD)",
+        yaxis_title="Number of Listings",
+        xaxis_tickformat="$,.0f",
+        margin=dict(b=150),
+    )
+    return fig
+
+
+def binned_histogram_chart(hist):
+    """``price_histogram_chart`` from precomputed bins (``utils.queries.price_histogram``)."""
+    fig = go.Figure(go.Bar(
+        x=(hist['bin_start'] + hist['bin_end']) / 2,
+        y=hist['count'],
+        width=hist['bin_end'] - hist['bin_start'],
+        marker_color=AIRBNB_COLORS[2],
+        customdata=hist[['bin_start', 'bin_end']],
+        hovertemplate="$%{customdata[0]:,.0f}–$%{customdata[1]:,.0f}<br>%{y:,} listings<extra></extra>",
+    ))
+
+    fig.update_layout(
+        template='plotly_white',
+        width=1000,
+        height=600,
+        title_text=None,
+        font=dict(color='black', family='Arial'),
+        xaxis_title="Price (USD)",
+        yaxis_title="Number of Listings",
+        xaxis_tickformat="$,.0f",
+        bargap=0,
+        margin=dict(b=150),
+    )
+    return fig
+
+
+def price_box(df):
+    fig = px.box(
+        df,
+        x='neighbourhood',
+        y='price',
+        color='room_type',
+        points='outliers',  # Show outlier points
+        color_discrete_sequence=AIRBNB_COLORS,
+        labels={'price': 'Listing Price (USD)', 'neighbourhood': 'Neighborhood'}
+    )
+
+    fig.update_layout(
+        template='plotly_white',
+        width=1000,
+        height=600,
+        title_text=None,
+        font=dict(color='black', family='Arial'),
+        xaxis_title="Neighborhood",
+        yaxis_title="Price (USD)",
+        xaxis_tickangle=-30,
+        yaxis_tickformat="$,.0f",
+        legend_title_text="Room Type",
+        legend_title_font=dict(color='black', size=16),
+        legend_font=dict(color='black', size=14),
+        margin=dict(b=150),
+    )
+    return fig
+
+
+def price_box_stats_chart(stats):
+    """``price_box`` from precomputed statistics (``SqlBackend.price_box_stats``), without outlier points."""
+    fig = go.Figure()
+    for k, (room_type, group) in enumerate(stats.groupby('room_type', sort=False)):
+        fig.add_trace(go.Box(
+            name=room_type,
+            x=group['neighbourhood'],
+            q1=group['q1'],
+            median=group['median'],
+            q3=group['q3'],
+            lowerfence=group['lowerfence'],
+            upperfence=group['upperfence'],
+            marker_color=AIRBNB_COLORS[k % len(AIRBNB_COLORS)],
+            boxpoints=False,
+        ))
+
+    fig.update_layout(
+        template='plotly_white',
+        width=1000,
+        height=600,
+        title_text=None,
+        boxmode='group',
+        font=dict(color='black', family='Arial'),
+        xaxis_title="Neighborhood",
+        yaxis_title="Price (USD)",
+        xaxis_tickangle=-30,
+        yaxis_tickformat="$,.0f",
+        legend_title_text="Room Type",
+        legend_title_font=dict(color='black', size=16),
+        legend_font=dict(color='black', size=14),
+        margin=dict(b=150),
+    )
+    return fig
+
+
+# =========================
+# Review Narratives
+# =========================
+
+def topic_radar(radar_df):
+    fig_radar = px.line_polar(
+        radar_df,
+        r="Mentions",
+        theta="Topic",
+        line_close=True,
+        width=600,
+        height=600
+    )
+
+    fig_radar.update_traces(
+        fill="toself",
+        line_color=AIRBNB_RED
+    )
+
+    if 'Mentions_low' in radar_df.columns:
+        # Approximate result: outline the 95% bounds of each topic's share
+        theta = list(radar_df['Topic']) + [radar_df['Topic'].iloc[0]]
+        for col, name in [('Mentions_low', "95% lower bound"), ('Mentions_high', "95% upper bound")]:
+            fig_radar.add_trace(go.Scatterpolar(
+                r=list(radar_df[col]) + [radar_df[col].iloc[0]],
+                theta=theta,
+                mode="lines",
+                line=dict(color=AIRBNB_RED, dash="dot", width=1),
+                name=name,
+                showlegend=False,
+            ))
+
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                showticklabels=False,
+                ticks='',
+                gridcolor="lightgray",
+            ),
+            angularaxis=dict(
+                tickfont=dict(size=12, color="black")
+            )
+        ),
+        template="plotly_white",
+        font=dict(color='black', family='Arial')
+    )
+    return fig_radar
+
+
+# Word cloud and scatter figures are built without pyplot so they can be
+# rendered on background threads (see utils.progressive)
+
+def phrase_wordcloud(phrases, width=800, height=400):
+    wc = WordCloud(width=width, height=height, background_color="white", colormap="Reds").generate_from_frequencies(phrases)
+    fig_wc = Figure(figsize=(12, 6))
+    ax_wc = fig_wc.subplots()
+    ax_wc.imshow(wc, interpolation="bilinear")
+    ax_wc.axis("off")
+    return fig_wc
+
+
+SENTIMENT_CATEGORIES = ["cleanliness", "price", "location"]
+
+
+def sentiment_scatter(df_sent, ci=95):
+    """Sentiment polarity against review rating, one regression panel per aspect."""
+    fig_scatter = Figure(figsize=(18, 5))
+    axes = fig_scatter.subplots(1, 3)
+
+    for ax, category in zip(axes, SENTIMENT_CATEGORIES):
+        sns.regplot(
+            data=df_sent,
+            x="review_scores_rating",
+            y=f"sentiment_{category}",
+            scatter_kws={'alpha':0.3, 'color':'#FF5A5F'},
+            line_kws={'color':'firebrick'},
+            ci=ci,
+            ax=ax
+        )
+        ax.set_title(category.capitalize())
+        ax.set_xlabel("Review Rating (1‑5)")
+        ax.set_ylabel("Sentiment Polarity")
+        ax.grid(True, linestyle="--", alpha=0.6)
+    return fig_scatter
+
+
+def tier_heatmap(values, bin_labels, title, vmin, vmax):
+    fig, ax = plt.subplots(figsize=(4, 5))
+    cmap = plt.cm.colors.LinearSegmentedColormap.from_list("AirbnbRed", AIRBNB_REDS)
+    im = ax.imshow(values.values.reshape(-1, 1), cmap=cmap, aspect="auto", origin="lower", vmin=vmin, vmax=vmax)
+    for i, val in enumerate(values):
+        ax.text(0, i, f"{val:.2f}", ha="center", va="center", color="black")
+    ax.set_yticks(range(len(bin_labels))); ax.set_yticklabels(bin_labels)
+    ax.set_xticks([]); ax.set_title(title)
+    plt.colorbar(im, ax=ax, shrink=0.8)
+    return fig
+
+
+def correlation_heatmap(corr, labels):
+    fig_corr, ax_corr = plt.subplots(figsize=(10, 8))
+    cax = ax_corr.matshow(corr, cmap="Reds", vmin=0, vmax=1)
+    fig_corr.colorbar(cax, ax=ax_corr)
+    ax_corr.set_xticks(range(len(labels)))
+    ax_corr.set_xticklabels(labels, rotation=45, ha="left")
+    ax_corr.set_yticks(range(len(labels)))
+    ax_corr.set_yticklabels(labels)
+    ax_corr.set_title("Correlation Matrix of Review Sub-Scores", pad=20)
+    return fig_corr
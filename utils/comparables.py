@@ -0,0 +1,81 @@
+"""Nearest-neighbour search for comparable listings.
+
+Each room type gets its own KD-tree over scaled location and size features,
+so a query only compares listings of the same room type and never scans the
+whole table.
+"""
+import math
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+FEATURE_COLS = ['latitude', 'longitude', 'bedrooms', 'beds']
+
+# One unit of each scaled feature counts as "equally different":
+# 1 km away ~ 1 extra bedroom ~ 2 extra beds
+KM_SCALE = 1.0
+BEDROOMS_SCALE = 1.0
+BEDS_SCALE = 2.0
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON = 111.320
+
+
+class ComparablesIndex:
+    """Prebuilt per-room-type KD-trees over listing features."""
+
+    def __init__(self, listings):
+        listings = listings.dropna(subset=FEATURE_COLS + ['room_type', 'price'])
+        self.listings = listings.reset_index(drop=True)
+        self.lat0 = float(self.listings['latitude'].mean()) if len(self.listings) else 0.0
+
+        self.models = {}
+        self.positions = {}
+        for room_type, group in self.listings.groupby('room_type'):
+            features = self._features(
+                group['latitude'].to_numpy(), group['longitude'].to_numpy(),
+                group['bedrooms'].to_numpy(), group['beds'].to_numpy(),
+            )
+            self.models[room_type] = NearestNeighbors(algorithm='kd_tree').fit(features)
+            self.positions[room_type] = group.index.to_numpy()
+
+    @property
+    def room_types(self):
+        return sorted(self.models)
+
+    def _features(self, lat, lon, bedrooms, beds):
+        x = np.asarray(lon, dtype=float) * KM_PER_DEG_LON * math.cos(math.radians(self.lat0))
+        y = np.asarray(lat, dtype=float) * KM_PER_DEG_LAT
+        return np.column_stack([
+            x / KM_SCALE,
+            y / KM_SCALE,
+            np.asarray(bedrooms, dtype=float) / BEDROOMS_SCALE,
+            np.asarray(beds, dtype=float) / BEDS_SCALE,
+        ])
+
+    def query(self, room_type, latitude, longitude, bedrooms, beds, k=10, exclude_id=None):
+        """The ``k`` most comparable listings, closest first.
+
+        Returns the matching listing rows with ``distance_km`` and
+        ``similarity_distance`` columns added. ``exclude_id`` drops the
+        target listing itself from its own comparables.
+        """
+        if room_type not in self.models:
+            return self.listings.iloc[0:0].assign(distance_km=[], similarity_distance=[])
+
+        model = self.models[room_type]
+        n = min(k + (exclude_id is not None), len(self.positions[room_type]))
+        target = self._features([latitude], [longitude], [bedrooms], [beds])
+        dist, idx = model.kneighbors(target, n_neighbors=n)
+
+        comps = self.listings.iloc[self.positions[room_type][idx[0]]]
+        comps = comps.assign(
+            similarity_distance=dist[0],
+            distance_km=np.hypot(
+                (comps['latitude'] - latitude) * KM_PER_DEG_LAT,
+                (comps['longitude'] - longitude) * KM_PER_DEG_LON * math.cos(math.radians(latitude)),
+            ),
+        )
+        if exclude_id is not None:
+            comps = comps[comps['listing_id'] != exclude_id]
+        return comps.head(k)
@@ -0,0 +1,108 @@
+"""Dataset paths and loaders shared by the pages.
+
+These functions are plain pandas so they can be reused outside Streamlit;
+pages wrap them in ``st.cache_*`` as needed.
+"""
+import os
+from typing import NamedTuple
+
+import pandas as pd
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+LISTINGS_FILE = "airbnb_cleaned.csv"
+NLP_FILE = "airbnb_nlp_processes.csv"
+LISTINGS_PATH = os.path.join(DATA_DIR, LISTINGS_FILE)
+NLP_PATH = os.path.join(DATA_DIR, NLP_FILE)
+
+# The files directly in data/ are the original single-borough dataset
+DEFAULT_CITY = "New York City"
+LEGACY_BOROUGH = "Manhattan"
+
+
+def clean_price(price):
+    """Convert a '$1,234.00'-style price column to floats."""
+    if pd.api.types.is_numeric_dtype(price):
+        return price.astype(float)
+    return price.astype(str).str.replace(r'[\$,]', '', regex=True).astype(float)
+
+
+def read_reviews(path=LISTINGS_PATH):
+    """Review-level rows (one per review) with a numeric price."""
+    df = pd.read_csv(path)
+    df['price'] = clean_price(df['price'])
+    return df
+
+
+def read_nlp(path=NLP_PATH):
+    """NLP-processed review rows with a numeric price."""
+    return read_reviews(path)
+
+
+def listings_from_reviews(reviews):
+    """Listing-level rows: the latest review row kept for each listing."""
+    df = reviews
+    if 'review_date' in df.columns:
+        df = df.sort_values('review_date')
+    df = df.drop_duplicates('listing_id', keep='last')
+    return df.reset_index(drop=True)
+
+
+def read_listings(path=LISTINGS_PATH):
+    """Listing-level rows read straight from a review-level file."""
+    return listings_from_reviews(read_reviews(path))
+
+
+def dataset_version(path):
+    """Cheap version tag for a data file; changes whenever the file is rewritten."""
+    stat = os.stat(path)
+    name = os.path.relpath(path, DATA_DIR).replace(os.sep, "/")
+    return f"{name}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+# =========================
+# City / borough partitions
+# =========================
+
+class Partition(NamedTuple):
+    """One borough of one city, stored in its own directory."""
+    city: str
+    borough: str
+    directory: str
+
+    @property
+    def listings_path(self):
+        return os.path.join(self.directory, LISTINGS_FILE)
+
+    @property
+    def nlp_path(self):
+        return os.path.join(self.directory, NLP_FILE)
+
+
+def display_name(slug):
+    """'new-york-city' -> 'New York City'."""
+    return slug.replace("-", " ").replace("_", " ").title()
+
+
+def discover_partitions(data_dir=DATA_DIR):
+    """City -> its partitions, found as ``data/<city>/<borough>/airbnb_cleaned.csv``.
+
+    The legacy files directly in ``data/`` count as Manhattan, New York City,
+    unless that partition also exists in the partitioned layout.
+    """
+    cities = {}
+    for city_slug in sorted(os.listdir(data_dir)):
+        city_dir = os.path.join(data_dir, city_slug)
+        if not os.path.isdir(city_dir):
+            continue
+        for borough_slug in sorted(os.listdir(city_dir)):
+            directory = os.path.join(city_dir, borough_slug)
+            if os.path.exists(os.path.join(directory, LISTINGS_FILE)):
+                city = display_name(city_slug)
+                cities.setdefault(city, []).append(Partition(city, display_name(borough_slug), directory))
+
+    legacy = Partition(DEFAULT_CITY, LEGACY_BOROUGH, data_dir)
+    boroughs = {p.borough for p in cities.get(DEFAULT_CITY, [])}
+    if os.path.exists(legacy.listings_path) and LEGACY_BOROUGH not in boroughs:
+        cities.setdefault(DEFAULT_CITY, []).insert(0, legacy)
+    return cities
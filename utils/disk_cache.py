@@ -0,0 +1,161 @@
+"""Persistent on-disk cache for computed aggregates and rendered figures.
+
+Entries are pickles keyed by a name, the dataset version, the query
+parameters and the versions of the libraries whose objects get pickled, so
+they survive server restarts and redeploys of the same data and are never
+served for a different data file or after a dependency upgrade. A small in-process LRU sits
+in front of the files so repeated reruns do not re-read them; it is bounded
+by its values' deep size (``utils.memory.RESULTS_BUDGET``), and a value
+larger than the whole budget is never kept. Large values (data frames,
+indexes) skip it with ``memory=False``: their in-memory copies are held,
+under the rest of the budget, by ``utils.store``.
+
+The cache lives in ``.cache/`` at the repo root (override with the
+``AIRBNB_CACHE_DIR`` environment variable).
+"""
+import hashlib
+import json
+import os
+import pickle
+import platform
+import tempfile
+import threading
+from collections import OrderedDict
+from importlib import metadata
+
+from utils.data import ROOT_DIR
+from utils.memory import RESULTS_BUDGET, memory_size
+
+CACHE_DIR = os.environ.get("AIRBNB_CACHE_DIR", os.path.join(ROOT_DIR, ".cache"))
+MAX_DISK_BYTES = 2 * 1024 ** 3
+MEMORY_ENTRIES = 128
+
+# Packages whose objects are pickled (frames, fitted models, KD-trees, figures)
+PICKLED_PACKAGES = ["numpy", "pandas", "scipy", "scikit-learn", "matplotlib"]
+
+_memory = OrderedDict()  # key -> (value, size in bytes)
+_memory_bytes = 0
+_lock = threading.Lock()
+
+
+def _package_version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+LIBRARY_VERSIONS = {
+    'python': platform.python_version(),
+    **{package: _package_version(package) for package in PICKLED_PACKAGES},
+}
+
+
+def cache_key(name, version, params=None):
+    canonical = json.dumps([name, version, params, LIBRARY_VERSIONS], sort_keys=True, default=str)
+    return f"{name}-{hashlib.sha256(canonical.encode()).hexdigest()[:24]}"
+
+
+def _path(key):
+    return os.path.join(CACHE_DIR, key + ".pkl")
+
+
+def _remember(key, value):
+    global _memory_bytes
+    size = memory_size(value)
+    if size > RESULTS_BUDGET:
+        return
+    with _lock:
+        if key in _memory:
+            _memory_bytes -= _memory.pop(key)[1]
+        _memory[key] = (value, size)
+        _memory_bytes += size
+        while len(_memory) > MEMORY_ENTRIES or _memory_bytes > RESULTS_BUDGET:
+            _, (_, evicted) = _memory.popitem(last=False)
+            _memory_bytes -= evicted
+
+
+def _load(key, memory=True):
+    """Value stored under ``key`` from memory or disk; raises ``KeyError`` on a miss."""
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key][0]
+
+    path = _path(key)
+    try:
+        with open(path, "rb") as f:
+            value = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        raise KeyError(key) from None
+    # refresh mtime so pruning evicts the least recently used entries
+    try:
+        os.utime(path)
+    except OSError:  # pruned by another worker meanwhile
+        pass
+    if memory:
+        _remember(key, value)
+    return value
+
+
+def lookup(name, version, params=None):
+    """``(True, value)`` if (name, version, params) is cached, else ``(False, None)``; never computes."""
+    try:
+        return True, _load(cache_key(name, version, params))
+    except KeyError:
+        return False, None
+
+
+def disk_cached(name, version, params, compute, memory=True):
+    """Return the cached value for (name, version, params), computing it on a miss.
+
+    Writes are atomic (temp file + rename), so concurrent workers can share
+    one cache directory; a corrupt or unreadable entry is just recomputed.
+    ``memory=False`` keeps the value out of the in-process LRU.
+    """
+    key = cache_key(name, version, params)
+    try:
+        return _load(key, memory)
+    except KeyError:
+        pass
+
+    value = compute()
+    tmp = None
+    try:
+        # a read-only or full disk only costs the persistence, not the value
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, _path(key))
+    except OSError:
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+
+    if memory:
+        _remember(key, value)
+    return value
+
+
+def prune(max_bytes=MAX_DISK_BYTES):
+    """Delete least recently used entries until the cache fits in ``max_bytes``."""
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        if name.endswith(".pkl"):
+            try:
+                stat = os.stat(path)
+            except OSError:  # removed by a concurrent prune
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
@@ -0,0 +1,247 @@
+"""Shared filter state for the neighbourhood / room type / price widgets.
+
+- Option lists are computed once per dataset version.
+- Each page's primary filters (the map sidebar, the trend filters, the
+  first charts of Price Insights and Review Narratives) are mirrored into
+  ``st.session_state`` per filter role (neighbourhoods, room types, price
+  range) so they carry over when the user switches pages. Other section
+  filters keep their own, independent state.
+- Filtered row selections are kept in a bounded LRU shared by every page and
+  session, keyed by the dataset version and the normalized filter values.
+- The city / borough selection is shared the same way; switching city resets
+  the other selections, whose options belong to the previous city.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+from utils.queries import filter_mask
+
+from utils.data import DEFAULT_CITY
+
+ALL = 'All'
+SHARED_KEY = "shared_filters"
+WIDGETS_KEY = "shared_filter_widgets"
+
+
+# =========================
+# Option lists
+# =========================
+
+@st.cache_data(show_spinner=False)
+def filter_options(dataset_key, _df, room_type_col='room_type'):
+    """Sorted neighbourhood / room type options and the price bounds of a dataset.
+
+    ``dataset_key`` must change with the data (e.g. include ``dataset_version``);
+    the frame itself is not hashed.
+    """
+    return {
+        'neighbourhoods': sorted(_df['neighbourhood'].dropna().unique()),
+        'room_types': sorted(_df[room_type_col].dropna().unique()),
+        'price_min': int(_df['price'].min()),
+        'price_max': int(_df['price'].max()),
+    }
+
+
+# =========================
+# Normalized filters and the row-selection cache
+# =========================
+
+def normalize_selection(selected, options):
+    """``None`` for "no restriction", otherwise a sorted tuple of values."""
+    if selected is None or ALL in selected or set(options) <= set(selected):
+        return None
+    return tuple(sorted(selected))
+
+
+def _normalize_range(value):
+    return None if value is None else (float(value[0]), float(value[1]))
+
+
+class RowSelectionCache:
+    """Thread-safe LRU of row positions, bounded by entry count and bytes."""
+
+    def __init__(self, max_entries=256, max_bytes=256 * 1024 ** 2):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            positions = self._entries.get(key)
+            if positions is not None:
+                self._entries.move_to_end(key)
+            return positions
+
+    def put(self, key, positions):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = positions
+            self._bytes += positions.nbytes
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+
+@st.cache_resource
+def row_selection_cache():
+    return RowSelectionCache()
+
+
+def filter_positions(df, dataset_key, columns=None, **filters):
+    """Row positions of ``df`` matching the given filters, served from the LRU.
+
+    ``filters`` are as for ``utils.queries.filter_mask``; selections should
+    be normalized with ``normalize_selection`` so equal filters share a key.
+    """
+    key = (dataset_key, tuple(sorted((columns or {}).items()))) + tuple(
+        (name, _normalize_range(value) if name.endswith('_range') else value)
+        for name, value in sorted(filters.items())
+    )
+
+    cache = row_selection_cache()
+    positions = cache.get(key)
+    if positions is None:
+        positions = np.flatnonzero(filter_mask(df, columns=columns, **filters))
+        positions.flags.writeable = False
+        cache.put(key, positions)
+    return positions
+
+
+def filter_rows(df, dataset_key, columns=None, **filters):
+    """Rows of ``df`` matching the filters (see ``filter_positions``)."""
+    positions = filter_positions(df, dataset_key, columns=columns, **filters)
+    if len(positions) == len(df):
+        return df
+    return df.iloc[positions]
+
+
+# =========================
+# Widgets whose selection carries across pages
+# =========================
+
+def _shared():
+    return st.session_state.setdefault(SHARED_KEY, {})
+
+
+def _register(key):
+    st.session_state.setdefault(WIDGETS_KEY, set()).add(key)
+
+
+def _store_selection(key, field, has_all):
+    value = st.session_state[key]
+    if (has_all and ALL in value) or (not has_all and not value):
+        value = None
+    _shared()[field] = value
+
+
+def shared_multiselect(label, field, options, default, key, container=st, has_all=True):
+    """Multiselect initialised from, and writing back to, the shared selection.
+
+    ``field`` is the page-level filter role shared across pages, or ``None``
+    for a section filter that only keeps its own selection. Shared values
+    are stored as ``None`` for "everything" or a list of options;
+    ``has_all`` says whether this widget expresses "everything" as an
+    ``'All'`` entry (otherwise as an empty selection).
+    """
+    _register(key)
+    if key not in st.session_state:
+        shared = _shared()
+        if field is not None and field in shared:
+            value = shared[field]
+            if value is None:
+                value = [ALL] if has_all else []
+            st.session_state[key] = [v for v in value if v in options]
+        else:
+            st.session_state[key] = default
+    if field is None:
+        return container.multiselect(label, options, key=key)
+    return container.multiselect(
+        label, options, key=key,
+        on_change=_store_selection, args=(key, field, has_all)
+    )
+
+
+def _store_range(key, field):
+    _shared()[field] = st.session_state[key]
+
+
+def shared_slider(label, field, min_value, max_value, default, key, container=st, **kwargs):
+    """Range slider initialised from, and writing back to, the shared selection.
+
+    ``field`` is as for ``shared_multiselect``.
+    """
+    _register(key)
+    if key not in st.session_state:
+        low, high = _shared().get(field, default) if field is not None else default
+        low = min(max(low, min_value), max_value)
+        high = min(max(high, low), max_value)
+        st.session_state[key] = (type(min_value)(low), type(min_value)(high))
+    if field is None:
+        return container.slider(label, min_value=min_value, max_value=max_value, key=key, **kwargs)
+    return container.slider(
+        label, min_value=min_value, max_value=max_value, key=key,
+        on_change=_store_range, args=(key, field), **kwargs
+    )
+
+
+# =========================
+# City / borough selection
+# =========================
+
+def _reset_selections():
+    """Forget every shared selection and widget state except the city's own."""
+    shared = _shared()
+    for field in list(shared):
+        if field not in ('city', 'boroughs'):
+            del shared[field]
+    for key in st.session_state.pop(WIDGETS_KEY, set()):
+        st.session_state.pop(key, None)
+
+
+def _store_city():
+    _shared()['city'] = st.session_state["city_select"]
+    _shared().pop('boroughs', None)
+    st.session_state.pop("borough_select", None)
+    _reset_selections()
+
+
+def _store_boroughs():
+    _shared()['boroughs'] = st.session_state["borough_select"]
+    _reset_selections()
+
+
+def city_selector(partitions, container=st.sidebar):
+    """City and borough pickers shared by every page.
+
+    ``partitions`` maps city -> partitions (``store.available_partitions()``).
+    Returns ``(city, boroughs)``; ``boroughs`` is ``None`` for the whole city.
+    """
+    if not partitions:
+        st.error("No datasets found in data/.")
+        st.stop()
+
+    cities = sorted(partitions)
+    shared = _shared()
+    if "city_select" not in st.session_state:
+        default = DEFAULT_CITY if DEFAULT_CITY in cities else cities[0]
+        st.session_state["city_select"] = shared['city'] if shared.get('city') in cities else default
+    city = container.selectbox("City:", cities, key="city_select", on_change=_store_city)
+    shared['city'] = city
+
+    boroughs = sorted(p.borough for p in partitions[city])
+    if len(boroughs) < 2:
+        return city, None
+    if "borough_select" not in st.session_state:
+        st.session_state["borough_select"] = [b for b in shared.get('boroughs') or [] if b in boroughs]
+    selected = container.multiselect(
+        "Borough(s) (none = whole city):", boroughs, key="borough_select", on_change=_store_boroughs
+    )
+    return city, tuple(sorted(selected)) or None
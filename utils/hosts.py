@@ -0,0 +1,115 @@
+"""Host-level portfolio aggregates and a host -> listings index.
+
+Built once per dataset version from the listing-level rows (one row per
+listing, ``utils.data.listings_from_reviews``), so host views never group
+the review rows at interaction time:
+
+- ``hosts``: one row per host with portfolio size, price and rating
+  statistics, review volume and geographic spread;
+- a host -> listings index: listings sorted by host with CSR offsets, so a
+  host's portfolio is one ``searchsorted`` away;
+- ``neighbourhood_hosts``: listing counts per (neighbourhood, host), for
+  the top hosts of any neighbourhood.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.spatial import haversine_m
+
+# Hosts with at least this many listings count as commercial / multi-listing
+MULTI_LISTING = 2
+
+
+class HostPortfolios:
+    """Precomputed host aggregates over a listing-level frame."""
+
+    def __init__(self, listings):
+        listings = listings.dropna(subset=['host_id']).astype({'host_id': 'int64'})
+        self.listings = listings.sort_values(['host_id', 'listing_id'], kind="stable").reset_index(drop=True)
+        self.host_ids, starts = np.unique(self.listings['host_id'].to_numpy(), return_index=True)
+        self.starts = np.append(starts, len(self.listings))
+
+        # Distance of each listing from its host's median location
+        grouped = self.listings.groupby('host_id', sort=True)
+        centre = grouped[['latitude', 'longitude']].transform('median')
+        spread_km = haversine_m(
+            self.listings['latitude'].to_numpy(), self.listings['longitude'].to_numpy(),
+            centre['latitude'].to_numpy(), centre['longitude'].to_numpy(),
+        ) / 1000
+        with_spread = self.listings.assign(
+            spread_km=spread_km,
+            entire_home=self.listings['room_type'] == 'Entire home/apt',
+        )
+
+        hosts = with_spread.groupby('host_id', sort=True).agg(
+            host_name=('host_name', 'first'),
+            listings=('listing_id', 'size'),
+            neighbourhoods=('neighbourhood', 'nunique'),
+            entire_homes=('entire_home', 'sum'),
+            median_price=('price', 'median'),
+            min_price=('price', 'min'),
+            max_price=('price', 'max'),
+            avg_rating=('review_scores_rating', 'mean'),
+            reviews=('number_of_reviews', 'sum'),
+            max_spread_km=('spread_km', 'max'),
+        )
+        per_neighbourhood = self.listings.groupby(['host_id', 'neighbourhood']).size().rename('listings_here').reset_index()
+        main = (
+            per_neighbourhood.sort_values(['host_id', 'listings_here'], ascending=[True, False], kind="stable")
+            .drop_duplicates('host_id').set_index('host_id')['neighbourhood']
+        )
+        hosts['main_neighbourhood'] = main
+        self.hosts = hosts.reset_index().sort_values(['listings', 'reviews'], ascending=False, ignore_index=True)
+        self._host_rows = pd.Index(self.hosts['host_id'])
+        self._names = self.hosts['host_name'].fillna("").astype(str).str.lower()
+
+        self.neighbourhood_hosts = (
+            per_neighbourhood
+            .merge(self.hosts[['host_id', 'host_name', 'listings']], on='host_id')
+            .sort_values(['neighbourhood', 'listings_here', 'listings'], ascending=[True, False, False], ignore_index=True)
+        )
+
+    def portfolio(self, host_id):
+        """Listing rows of one host (empty if unknown)."""
+        i = np.searchsorted(self.host_ids, host_id)
+        if i == len(self.host_ids) or self.host_ids[i] != host_id:
+            return self.listings.iloc[:0]
+        return self.listings.iloc[self.starts[i]:self.starts[i + 1]]
+
+    def host(self, host_id):
+        """Aggregate row of one host."""
+        return self.hosts.iloc[self._host_rows.get_loc(host_id)]
+
+    def search(self, query, n=50):
+        """Hosts whose id equals ``query`` or whose name contains it, largest first."""
+        query = query.strip()
+        if query.isdigit() and int(query) in self._host_rows:
+            return self.hosts.iloc[[self._host_rows.get_loc(int(query))]]
+        matches = self._names.str.contains(query.lower(), regex=False)
+        return self.hosts[matches.to_numpy()].head(n)
+
+    def top_hosts(self, neighbourhood=None, n=20, min_listings=1):
+        """Largest hosts overall, or by listings inside ``neighbourhood``."""
+        if neighbourhood is None:
+            return self.hosts[self.hosts['listings'] >= min_listings].head(n)
+        table = self.neighbourhood_hosts
+        table = table[(table['neighbourhood'] == neighbourhood) & (table['listings'] >= min_listings)]
+        return table.head(n).merge(self.hosts.drop(columns=['host_name', 'listings']), on='host_id')
+
+    def summary(self):
+        """Host count, multi-listing host count and their share of listings."""
+        multi = self.hosts['listings'] >= MULTI_LISTING
+        return {
+            'hosts': len(self.hosts),
+            'multi_listing_hosts': int(multi.sum()),
+            'multi_listing_share': float(self.hosts.loc[multi, 'listings'].sum() / max(len(self.listings), 1)),
+        }
+
+
+def portfolio_sizes(hosts):
+    """Number of hosts by portfolio size bucket."""
+    buckets = pd.cut(
+        hosts['listings'], bins=[0, 1, 2, 5, 10, 50, np.inf],
+        labels=["1", "2", "3–5", "6–10", "11–50", "50+"],
+    )
+    return buckets.value_counts(sort=False).rename_axis('Listings per host').reset_index(name='Hosts')
@@ -0,0 +1,177 @@
+"""Resized variants of the static images in images/, and serving them.
+
+Build once, and again after changing anything in images/::
+
+    python -m utils.images
+
+Every image gets JPEG variants at each of ``WIDTHS`` narrower than the
+original (plus one at the original width, capped at the widest of
+``WIDTHS``), written to ``images/variants/`` with a ``manifest.json``.
+Images whose source and settings (widths, quality) are unchanged are
+skipped; variants no longer in the manifest are deleted.
+
+Pages show images with ``show_image``: it picks the smallest variant at
+least as wide as the image is displayed (narrower on phones) and keeps the
+encoded bytes in a process-wide cache, so reruns never read the file again.
+JPEG variants no wider than the page are passed through by ``st.image``
+as-is (other formats are re-encoded to PNG on every run). Without built
+variants the original file is served the same way.
+"""
+import argparse
+import json
+import os
+import re
+
+import streamlit as st
+
+from utils.data import ROOT_DIR
+
+IMAGES_DIR = os.path.join(ROOT_DIR, "images")
+VARIANTS_DIR = os.path.join(IMAGES_DIR, "variants")
+MANIFEST_PATH = os.path.join(VARIANTS_DIR, "manifest.json")
+SOURCE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# Rendered width in device pixels: the content column of a wide-layout page
+# on a laptop screen, or a ~400 CSS px phone screen at 2x pixel density
+CONTENT_WIDTH = 1200
+MOBILE_WIDTH = 960
+
+WIDTHS = (480, MOBILE_WIDTH, CONTENT_WIDTH)
+JPEG_QUALITY = 82
+MOBILE_RE = re.compile(r"Mobi|Android|iPhone|iPad")
+
+
+# =========================
+# Build
+# =========================
+
+def _read_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _is_stale(path, source):
+    return not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source)
+
+
+def _encode(image, width, path):
+    from PIL import Image
+
+    height = round(image.height * width / image.width)
+    resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+
+    # JPEG has no alpha channel: flatten onto white
+    if resized.mode == "RGBA":
+        flat = Image.new("RGB", resized.size, "white")
+        flat.paste(resized, mask=resized.getchannel("A"))
+        resized = flat
+    resized.convert("RGB").save(path, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+
+
+def build_variants(images_dir=IMAGES_DIR, out_dir=VARIANTS_DIR, widths=WIDTHS):
+    """Write the variants of every image in ``images_dir`` and return the manifest."""
+    from PIL import Image
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    previous = _read_manifest(manifest_path)
+    settings = {'widths': sorted(widths), 'jpeg_quality': JPEG_QUALITY}
+    manifest = {}
+    for name in sorted(os.listdir(images_dir)):
+        if not name.lower().endswith(SOURCE_EXTENSIONS):
+            continue
+        source = os.path.join(images_dir, name)
+        stem = os.path.splitext(name)[0]
+        # Rebuild everything if the widths or quality changed since the last build
+        rebuild = previous.get(name, {}).get('settings') != settings
+        with Image.open(source) as image:
+            image = image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+            largest = min(image.width, max(widths))
+            targets = sorted({w for w in widths if w < largest} | {largest})
+
+            variants = []
+            for width in targets:
+                file = f"{stem}-{width}.jpg"
+                path = os.path.join(out_dir, file)
+                if rebuild or _is_stale(path, source):
+                    _encode(image, width, path)
+                variants.append({'width': width, 'jpeg': file, 'bytes': os.path.getsize(path)})
+            manifest[name] = {'width': image.width, 'height': image.height, 'settings': settings, 'variants': variants}
+
+    # Drop variants of removed images or widths
+    keep = {v['jpeg'] for entry in manifest.values() for v in entry['variants']} | {"manifest.json"}
+    for file in os.listdir(out_dir):
+        if file not in keep:
+            os.remove(os.path.join(out_dir, file))
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def pick_variant(entry, width):
+    """File name of the narrowest variant at least ``width`` wide (else the widest)."""
+    variants = sorted(entry['variants'], key=lambda v: v['width'])
+    for variant in variants:
+        if variant['width'] >= width:
+            return variant['jpeg']
+    return variants[-1]['jpeg']
+
+
+# =========================
+# Serving
+# =========================
+
+@st.cache_resource(show_spinner=False)
+def _manifest(version):
+    return _read_manifest(MANIFEST_PATH)
+
+
+def manifest():
+    """The built manifest (empty if ``python -m utils.images`` has not run), reloaded when rebuilt."""
+    version = os.path.getmtime(MANIFEST_PATH) if os.path.exists(MANIFEST_PATH) else None
+    return _manifest(version)
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def image_bytes(path, mtime):
+    """Encoded image file contents, read once per file version."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def display_width():
+    """Device-pixel width the image is rendered at, from the client's user agent."""
+    headers = getattr(getattr(st, "context", None), "headers", None) or {}
+    if MOBILE_RE.search(headers.get("User-Agent", "")):
+        return MOBILE_WIDTH
+    return CONTENT_WIDTH
+
+
+def show_image(name, width=None, caption=None):
+    """``st.image`` of ``images/<name>``, served from the best-fitting built variant."""
+    entry = manifest().get(name)
+    if entry:
+        path = os.path.join(VARIANTS_DIR, pick_variant(entry, width or display_width()))
+    else:
+        path = os.path.join(IMAGES_DIR, name)
+    st.image(image_bytes(path, os.path.getmtime(path)), caption=caption, use_container_width=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build resized JPEG variants of images/.")
+    parser.add_argument("--widths", default=",".join(map(str, WIDTHS)), help="comma-separated variant widths")
+    args = parser.parse_args()
+
+    manifest = build_variants(widths=tuple(int(w) for w in args.widths.split(",")))
+    for name, entry in manifest.items():
+        original = os.path.getsize(os.path.join(IMAGES_DIR, name))
+        sizes = ", ".join(f"{v['width']}px {v['bytes'] / 1024:.0f} KB" for v in entry['variants'])
+        print(f"{name} ({original / 1024:.0f} KB): {sizes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Concurrent-session load test for the multipage app.
+
+Simulates N concurrent sessions with Streamlit's headless ``AppTest``
+runner, one process per session: ``AppTest`` patches process-global state
+(the runtime singleton, config options) on every run, so sessions sharing a
+process would interfere in ways a real server's don't. Each session opens
+Home.py, visits every page and replays a short widget script per page;
+every rerun is timed. Concurrency is stepped up and, for each level,
+throughput, p50/p95/p99 rerun latency, CPU and memory are reported::
+
+    python -m utils.loadtest --levels 1,4,8,16 --iterations 3
+    python -m utils.loadtest --compare loadtest_results/previous.json
+
+What the numbers measure: script execution time per rerun (data loading,
+filtering, computation and element building) under N sessions competing for
+the machine's CPU, disk and the shared disk cache (``.cache/``). What they
+don't: each session has its own in-memory caches, as if every session had
+its own server worker, so cross-session sharing of ``utils.store`` and
+Streamlit's caches is not exercised; nor are the server's websocket,
+protobuf serialization and browser rendering. CPU and memory are summed
+over the session processes.
+
+Results are written as JSON to ``loadtest_results/`` so they can be tracked
+across releases; ``--compare`` exits non-zero when p95 latency or throughput
+regresses by more than ``--tolerance``.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from utils.data import ROOT_DIR
+
+HOME = os.path.join(ROOT_DIR, "Home.py")
+RESULTS_DIR = os.path.join(ROOT_DIR, "loadtest_results")
+
+
+# =========================
+# Session scripts: page -> widget interactions (each followed by a rerun)
+# =========================
+
+def _pick(widget, n=2):
+    """A few real options of a multiselect, skipping the 'All' entry."""
+    options = [o for o in widget.options if o != 'All']
+    return options[:n]
+
+
+SCRIPTS = {
+    "pages/Map_Exploration.py": [
+        lambda at: at.multiselect(key="map_room_type_multiselect").set_value(
+            _pick(at.multiselect(key="map_room_type_multiselect"), 1)),
+        lambda at: at.slider(key="map_price_slider").set_value((100, 400)),
+        lambda at: at.radio[0].set_value("Within a radius"),
+    ],
+    "pages/Price_Insights.py": [
+        lambda at: at.multiselect(key="room_type_bar_multiselect").set_value(
+            _pick(at.multiselect(key="room_type_bar_multiselect"))),
+        lambda at: at.slider(key="price_hist_slider").set_value((50, 400)),
+        lambda at: at.multiselect(key="neighborhood_box_multiselect").set_value(
+            _pick(at.multiselect(key="neighborhood_box_multiselect"), 3)),
+    ],
+    "pages/Review_Narratives.py": [
+        lambda at: at.multiselect(key="topic_neighborhood_multiselect").set_value(
+            _pick(at.multiselect(key="topic_neighborhood_multiselect"))),
+        lambda at: at.slider(key="wc_price_slider").set_value(
+            (at.slider(key="wc_price_slider").min, 300)),
+    ],
+    "pages/Review_Trends.py": [
+        lambda at: at.radio[0].set_value("Room Type"),
+    ],
+    "pages/Comparable_Listings.py": [
+        lambda at: at.slider[0].set_value(30),
+    ],
+    "pages/Host_Portfolios.py": [
+        lambda at: at.slider[0].set_value(5),
+    ],
+    "pages/About_the_Project.py": [],
+}
+
+
+class SessionStats:
+    """Rerun timings and errors collected by the sessions of one level."""
+
+    def __init__(self):
+        self.latencies = []
+        self.by_page = {}
+        self.errors = []
+
+    def record(self, page, seconds, error=None):
+        self.latencies.append(seconds)
+        self.by_page.setdefault(page, []).append(seconds)
+        if error:
+            self.errors.append(f"{page}: {error}")
+
+    def merge(self, other):
+        self.latencies.extend(other.latencies)
+        for page, values in other.by_page.items():
+            self.by_page.setdefault(page, []).extend(values)
+        self.errors.extend(other.errors)
+
+
+def _timed_run(at, page, stats, timeout):
+    start = time.perf_counter()
+    error = None
+    try:
+        at.run(timeout=timeout)
+        if at.exception:
+            error = at.exception[0].message
+    except Exception as e:  # a timed-out or crashed rerun still counts
+        error = repr(e)
+    stats.record(page, time.perf_counter() - start, error)
+
+
+def run_session(iterations, think, timeout, seed):
+    """One simulated session, run in its own process.
+
+    Returns its stats, wall-clock start and end (``time.time``), CPU
+    seconds and resident memory.
+    """
+    stats = SessionStats()
+    rng = random.Random(seed)
+    start = time.time()
+    at = AppTest.from_file(HOME, default_timeout=timeout)
+    _timed_run(at, "Home.py", stats, timeout)
+
+    for _ in range(iterations):
+        for page, steps in SCRIPTS.items():
+            at.switch_page(page)
+            _timed_run(at, page, stats, timeout)
+            for step in steps:
+                if think:
+                    time.sleep(rng.uniform(0, think))
+                try:
+                    step(at)
+                except Exception as e:  # widget missing, e.g. an empty page
+                    stats.record(page, 0.0, f"script step failed: {e!r}")
+                    continue
+                _timed_run(at, page, stats, timeout)
+    return stats, start, time.time(), time.process_time(), _rss_mb()
+
+
+# =========================
+# Resource usage
+# =========================
+
+def _rss_mb():
+    """Current resident set size in MB (the peak where /proc is missing, ``None`` on Windows)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def _round(value):
+    return None if value is None else round(value, 1)
+
+
+def _cell(value):
+    return "–" if value is None else str(value)
+
+
+def _percentiles(values):
+    if not values:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+    return {'p50_ms': round(p50, 1), 'p95_ms': round(p95, 1), 'p99_ms': round(p99, 1)}
+
+
+def run_level(concurrency, iterations, think, timeout):
+    stats = SessionStats()
+    starts, ends, cpu, rss = [], [], 0.0, []
+
+    # one fresh process per session ("spawn": no state inherited from this one)
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(concurrency, maxtasksperchild=1) as pool:
+        sessions = pool.starmap(
+            run_session, [(iterations, think, timeout, seed) for seed in range(concurrency)], chunksize=1
+        )
+        for session, start, end, session_cpu, session_rss in sessions:
+            stats.merge(session)
+            starts.append(start)
+            ends.append(end)
+            cpu += session_cpu
+            rss.append(session_rss)
+
+    # from the first session's start to the last one's end (process start-up excluded)
+    wall = max(ends) - min(starts)
+    return {
+        'concurrency': concurrency,
+        'reruns': len(stats.latencies),
+        'errors': len(stats.errors),
+        'wall_s': round(wall, 2),
+        'throughput_rps': round(len(stats.latencies) / wall, 2),
+        **_percentiles(stats.latencies),
+        'cpu_cores_used': round(cpu / wall, 2),
+        'rss_mb': _round(None if None in rss else sum(rss)),
+        'pages': {page: _percentiles(v) for page, v in sorted(stats.by_page.items())},
+        'error_samples': stats.errors[:5],
+    }
+
+
+# =========================
+# Reporting
+# =========================
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(levels):
+    header = f"{'sessions':>8} {'reruns':>7} {'err':>4} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'cpu':>5} {'rss MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in levels:
+        print(f"{r['concurrency']:>8} {r['reruns']:>7} {r['errors']:>4} {r['throughput_rps']:>7} "
+              f"{_cell(r['p50_ms']):>8} {_cell(r['p95_ms']):>8} {_cell(r['p99_ms']):>8} "
+              f"{r['cpu_cores_used']:>5} {_cell(r['rss_mb']):>8}")
+
+
+def compare(current, baseline, tolerance):
+    """Regression messages for levels present in both runs."""
+    previous = {r['concurrency']: r for r in baseline['levels']}
+    problems = []
+    for r in current['levels']:
+        old = previous.get(r['concurrency'])
+        if not old or not old['p95_ms'] or not r['p95_ms']:
+            continue
+        if r['p95_ms'] > old['p95_ms'] * (1 + tolerance):
+            problems.append(f"{r['concurrency']} sessions: p95 {old['p95_ms']} -> {r['p95_ms']} ms")
+        if r['throughput_rps'] < old['throughput_rps'] * (1 - tolerance):
+            problems.append(f"{r['concurrency']} sessions: throughput {old['throughput_rps']} -> {r['throughput_rps']} rps")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Streamlit app with concurrent simulated sessions.")
+    parser.add_argument("--levels", default="1,2,4,8", help="comma-separated concurrency levels")
+    parser.add_argument("--iterations", type=int, default=2, help="page tours per session")
+    parser.add_argument("--think", type=float, default=0.0, help="max random think time between interactions (s)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-rerun timeout (s)")
+    parser.add_argument("--out", default=None, help="result file (default: loadtest_results/<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="baseline result file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    args = parser.parse_args()
+
+    levels = []
+    for concurrency in [int(n) for n in args.levels.split(",")]:
+        print(f"Running {concurrency} concurrent session(s)…", flush=True)
+        levels.append(run_level(concurrency, args.iterations, args.think, args.timeout))
+
+    result = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        'revision': _git_revision(),
+        'iterations': args.iterations,
+        'think_s': args.think,
+        'cpu_count': os.cpu_count(),
+        'levels': levels,
+    }
+
+    print()
+    print_table(levels)
+
+    out = args.out or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            problems = compare(result, json.load(f), args.tolerance)
+        if problems:
+            print("\nRegressions against " + args.compare + ":")
+            print("\n".join(f"  - {p}" for p in problems))
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""The process memory budget and deep object sizes used to enforce it.
+
+``AIRBNB_MEMORY_BUDGET_MB`` (default 4096) bounds what a server process
+keeps in memory: most of it goes to ``utils.store``'s frames and views, and
+``RESULTS_SHARE`` of it to the disk cache's in-process tier (aggregates,
+fitted models, rendered figures).
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+MEMORY_BUDGET = int(os.environ.get("AIRBNB_MEMORY_BUDGET_MB", 4096)) * 1024 ** 2
+RESULTS_SHARE = 0.125
+RESULTS_BUDGET = int(MEMORY_BUDGET * RESULTS_SHARE)
+FRAMES_BUDGET = MEMORY_BUDGET - RESULTS_BUDGET
+
+
+def memory_size(obj, _seen=None):
+    """Approximate deep size in bytes of a frame, array, or object holding them."""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(memory_size(k, seen) + memory_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(memory_size(v, seen) for v in obj)
+    if hasattr(obj, "get_arrays"):  # scikit-learn KD / ball trees
+        return sum(memory_size(a, seen) for a in obj.get_arrays())
+    if hasattr(obj, "__dict__"):
+        return sys.getsizeof(obj) + memory_size(vars(obj), seen)
+    return sys.getsizeof(obj)
@@ -0,0 +1,181 @@
+"""Progressive rendering: an approximate chart first, the exact one when ready.
+
+A heavy section is first drawn from a stratified sample sized to fit a
+latency budget, while its exact result is computed on a shared background
+thread pool and written to the disk cache. The section polls its future
+from a fragment, so the script run returns immediately; once the exact
+result is in, the page reruns, finds it cached and skips the approximation.
+Results are plain data or PNG bytes, so the worker threads never touch
+Streamlit elements. A failed computation is logged and shown as a warning
+without polling again.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from utils.disk_cache import cache_key, lookup
+
+# Seconds each approximate chart may take on the script thread
+BUDGET_S = 0.25
+MIN_ROWS = 200
+MAX_ROWS = 20000
+# Seconds between checks of a pending exact result
+POLL_S = 0.5
+ESTIMATES_KEY = "progressive_estimates"
+FAILURES_KEY = "progressive_failures"
+MAX_ESTIMATES = 16
+
+logger = logging.getLogger(__name__)
+
+
+@st.cache_resource
+def _executor():
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="exact-view")
+
+
+@st.cache_resource
+def _in_flight():
+    """Exact computations already running, by cache key, shared by all sessions."""
+    return {}, threading.Lock()
+
+
+@st.cache_resource
+def _throughput():
+    """Observed rows per second of each approximate chart (moving average)."""
+    return {}
+
+
+def budget_rows(chart, initial_rate, budget_s=BUDGET_S):
+    """Sample size expected to render ``chart`` within ``budget_s`` seconds."""
+    rate = _throughput().get(chart, initial_rate)
+    return int(min(max(rate * budget_s, MIN_ROWS), MAX_ROWS))
+
+
+def _observe(chart, rows, seconds, initial_rate):
+    rates = _throughput()
+    rate = rows / max(seconds, 1e-3)
+    rates[chart] = 0.7 * rates.get(chart, initial_rate) + 0.3 * rate
+
+
+def submit_exact(key, exact):
+    """The running future for ``key``, or a new one if none is in flight."""
+    futures, lock = _in_flight()
+    with lock:
+        future = futures.get(key)
+        if future is None:
+            future = _executor().submit(exact)
+            futures[key] = future
+            future.add_done_callback(lambda _: futures.pop(key, None))
+        return future
+
+
+def _pending_section(key, future, estimate, approx, render):
+    """Fragment that shows the approximation and polls the exact computation.
+
+    When the future finishes the whole page reruns once (which ends the
+    polling): the section then finds the exact value in the cache or, if
+    the computation failed, shows a warning instead of the approximation.
+    The script run itself never waits.
+    """
+    @st.fragment(run_every=POLL_S)
+    def poll():
+        if future.done():
+            _estimates().pop(key, None)
+            error = future.exception()
+            if error is not None:
+                if not isinstance(error, ValueError):
+                    logger.error("Exact computation failed", exc_info=error)
+                _failures()[key] = error
+            st.rerun()
+        if estimate is None:
+            st.info("⏳ Computing on all matching reviews…")
+        else:
+            render(estimate, approx)
+
+    poll()
+
+
+def _estimates():
+    """Approximations shown while their exact result is pending, per session."""
+    return st.session_state.setdefault(ESTIMATES_KEY, {})
+
+
+def _failures():
+    """Exact computations that failed, per session, so they are not retried on every rerun."""
+    return st.session_state.setdefault(FAILURES_KEY, {})
+
+
+def _show_failure(error):
+    if isinstance(error, ValueError):
+        # e.g. too few reviews for the vectorizer's min_df
+        st.warning("⚠️ Not enough reviews to compute this chart for the selected filters.")
+    else:
+        st.warning("⚠️ This chart could not be computed. Please try again later.")
+
+
+def progressive_section(chart, name, dataset_key, params, n_rows, exact, approximate, render, initial_rate=2000):
+    """Render one progressive chart.
+
+    ``exact()`` computes (and disk-caches under ``name``) the exact value;
+    ``approximate(n)`` computes a value from a stratified sample of about
+    ``n`` of the ``n_rows`` filtered rows; ``render(value, approx)`` draws
+    a value, with ``approx`` set to ``(sampled, total)`` for approximations.
+    """
+    cached, value = lookup(name, dataset_key, params)
+    n = budget_rows(chart, initial_rate)
+    if cached:
+        render(value, None)
+        return
+    if n_rows <= n:
+        # small enough to compute exactly within the budget
+        _render_exact(st.container(), exact, render)
+        return
+
+    key = cache_key(name, dataset_key, params)
+    failures = _failures()
+    if key in failures:
+        _show_failure(failures[key])
+        return
+    if len(failures) >= MAX_ESTIMATES:
+        failures.clear()
+
+    future = submit_exact(key, exact)
+    estimates = _estimates()
+    if key not in estimates:
+        if len(estimates) >= MAX_ESTIMATES:
+            estimates.clear()  # left over from filters no longer on screen
+        start = time.perf_counter()
+        try:
+            estimates[key] = approximate(n)
+        except ValueError:
+            # e.g. too few documents in the sample for the vectorizer
+            estimates[key] = None
+        except Exception:
+            logger.exception("Approximate %s failed", chart)
+            estimates[key] = None
+        _observe(chart, n, time.perf_counter() - start, initial_rate)
+    _pending_section(key, future, estimates[key], (n, n_rows), render)
+
+
+def _render_exact(container, get_value, render):
+    with container:
+        try:
+            value = get_value()
+        except Exception as e:
+            if not isinstance(e, ValueError):
+                logger.exception("Exact computation failed")
+            _show_failure(e)
+        else:
+            render(value, None)
+
+
+def approximate_caption(approx):
+    """Caption marking a chart as approximate."""
+    sampled, total = approx
+    st.caption(
+        f"⏳ Approximate — stratified sample of {sampled:,} of {total:,} reviews "
+        "(by neighbourhood and room type). Updating with all reviews…"
+    )
@@ -0,0 +1,185 @@
+"""Filtering and aggregation logic behind the page charts.
+
+Plain pandas / scikit-learn only, so the Streamlit pages, the headless query
+API and batch jobs all compute exactly the same numbers.
+"""
+import ast
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.feature_extraction.text import CountVectorizer
+
+from utils.sampling import stratified_sample, stratified_shares
+
+# Filter argument -> column it applies to
+FILTER_COLUMNS = {
+    'neighbourhoods': 'neighbourhood',
+    'room_types': 'room_type',
+    'price_range': 'price',
+    'rating_range': 'review_scores_rating',
+}
+
+TOPIC_LABELS = [
+    "Transportation", "Service", "Host/Location", "Amenities", "Cleanliness",
+    "Pricing", "Check‑in", "Food", "Noise"
+]
+
+SCORE_COLS = [
+    "review_scores_accuracy", "review_scores_cleanliness", "review_scores_checkin",
+    "review_scores_communication", "review_scores_location", "review_scores_value", "review_scores_rating"
+]
+
+SCORE_LABELS = [
+    "Description Accuracy", "Cleanliness", "Smooth Checkin",
+    "Host Communication", "Location", "Value", "Overall Rating"
+]
+
+
+# =========================
+# Filters
+# =========================
+
+def filter_mask(df, columns=None, **filters):
+    """Boolean mask for ``FILTER_COLUMNS``-style filters.
+
+    Selections are collections of allowed values and ranges are inclusive
+    ``(low, high)`` tuples; ``None`` leaves that filter off.
+    """
+    columns = {**FILTER_COLUMNS, **(columns or {})}
+    mask = np.ones(len(df), dtype=bool)
+    for name, value in filters.items():
+        if value is None:
+            continue
+        col = df[columns[name]]
+        if name.endswith('_range'):
+            mask &= ((col >= value[0]) & (col <= value[1])).to_numpy()
+        else:
+            mask &= col.isin(value).to_numpy()
+    return mask
+
+
+def apply_filters(df, columns=None, **filters):
+    """Rows of ``df`` matching the filters (see ``filter_mask``)."""
+    if all(value is None for value in filters.values()):
+        return df
+    return df[filter_mask(df, columns=columns, **filters)]
+
+
+# =========================
+# Price Insights
+# =========================
+
+def average_price(df):
+    """Average price per neighbourhood and room type."""
+    return df.groupby(['neighbourhood', 'room_type'])['price'].mean().reset_index()
+
+
+def price_histogram(df, bins=50, price_range=None):
+    """Listing counts per price bin as a frame of bin edges and counts."""
+    prices = df['price'].dropna().to_numpy()
+    counts, edges = np.histogram(prices, bins=bins, range=price_range)
+    return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts})
+
+
+# =========================
+# Review Narratives
+# =========================
+
+def fit_topic_model(df, n_topics=5, sample_size=3000, random_state=42):
+    """LDA model over the reviews' ``joined_tokens``, fit on a stratified sample.
+
+    Returns ``(vectorizer, lda)``. The sample (see ``utils.sampling``) and
+    the fit are deterministic, so equal inputs give the same topics.
+    """
+    sample_df = stratified_sample(df, sample_size, random_state=random_state)
+    vectorizer = CountVectorizer(max_df=0.9, min_df=10, max_features=3000, stop_words="english")
+    dtm = vectorizer.fit_transform(sample_df['joined_tokens'].fillna(""))
+
+    lda = LatentDirichletAllocation(n_components=n_topics, random_state=random_state)
+    lda.fit(dtm)
+    return vectorizer, lda
+
+
+def topic_mentions(model, df, sample_size=None, random_state=42):
+    """Reviews per topic of a fitted ``model``.
+
+    Every review is assigned its topic, or with ``sample_size`` only a
+    stratified sample of that many: counts are then estimated for
+    ``len(df)`` reviews with stratum weights (``stratified_shares``) and
+    95% bounds are added as ``Mentions_low`` / ``Mentions_high``.
+    Topic indices come from the model, so exact and sampled counts of the
+    same model line up topic by topic.
+
+    Returns one row per topic with ``Topic`` label and ``Mentions`` count.
+    """
+    vectorizer, lda = model
+    n_topics = lda.n_components
+    rows = df if sample_size is None else stratified_sample(df, sample_size, random_state=random_state)
+    dtm = vectorizer.transform(rows['joined_tokens'].fillna(""))
+    labels = lda.transform(dtm).argmax(axis=1)
+    counts = (
+        pd.Series(labels)
+        .value_counts().sort_index()
+        .reindex(range(n_topics), fill_value=0)
+    )
+
+    topics = counts.rename("Mentions").to_frame().assign(Topic=TOPIC_LABELS[:n_topics])
+    if len(rows) == len(df):
+        return topics
+    share, low, high = stratified_shares(rows, df, labels, n_topics)
+    return topics.assign(
+        Mentions=share * len(df),
+        Mentions_low=low * len(df),
+        Mentions_high=high * len(df),
+    )
+
+
+def approximate_topic_mentions(df, sample_size, n_topics=5, random_state=42):
+    """Topic mentions estimated from a stratified sample, by a model fit on that sample alone.
+
+    Cheap enough for the script thread while the full model
+    (``fit_topic_model``) is fit in the background.
+    """
+    sample = stratified_sample(df, sample_size, random_state=random_state)
+    model = fit_topic_model(sample, n_topics, sample_size=len(sample), random_state=random_state)
+    return topic_mentions(model, df, sample_size=sample_size, random_state=random_state)
+
+
+def topic_distribution(df, n_topics=5, sample_size=3000, random_state=42):
+    """Topic mentions of every review under a model fit on ``sample_size`` of them."""
+    model = fit_topic_model(df, n_topics, sample_size, random_state)
+    return topic_mentions(model, df, random_state=random_state)
+
+
+def phrase_counts(df):
+    """Adjective–noun phrase frequencies from the ``adj_noun_phrases`` list strings."""
+    return Counter(
+        p for plist in df['adj_noun_phrases'].dropna()
+        for p in ast.literal_eval(plist)
+    )
+
+
+def price_tier_metrics(df, n_bins):
+    """Average rating and sentiment per price quantile tier (Tier 1 = cheapest)."""
+    bin_labels = [f"Tier {i+1}" for i in range(n_bins)]
+    tiers = pd.qcut(df["price"], q=n_bins, labels=bin_labels)
+    grouped = df.groupby(tiers, observed=False)
+    return pd.DataFrame({
+        'avg_rating': grouped["review_scores_rating"].mean(),
+        'avg_sentiment': grouped["sentiment_compound"].mean(),
+    }).reindex(bin_labels)
+
+
+def score_correlations(df):
+    """Correlation matrix of the review sub-scores present in ``df``.
+
+    Returns ``(corr, labels)``; ``corr`` is ``None`` if fewer than two
+    sub-score columns are available.
+    """
+    available = [(c, label) for c, label in zip(SCORE_COLS, SCORE_LABELS) if c in df.columns]
+    if len(available) < 2:
+        return None, []
+    cols, labels = zip(*available)
+    return df[list(cols)].corr(), list(labels)
@@ -0,0 +1,214 @@
+"""Batch neighbourhood reports: every chart for every neighbourhood, pre-rendered.
+
+Renders the Price Insights and Review Narratives charts for each
+neighbourhood (optionally split by room type) to static files with a
+process pool::
+
+    python -m utils.reports --out reports --workers 8 --by-room-type
+
+Plotly charts are written as HTML, Matplotlib charts as PNG, plus an
+``index.html`` linking every report. The datasets and the shared aggregates
+are loaded once in the parent process; on Linux the workers are forked and
+share those pages copy-on-write, elsewhere (where fork is unsafe or missing)
+they are spawned and receive the state pickled once per worker, instead of
+each re-reading the CSVs.
+"""
+import argparse
+import html
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+from utils.charts import (
+    average_price_bar, correlation_heatmap, phrase_wordcloud, price_box, price_histogram_chart,
+    tier_heatmap, topic_radar,
+)
+from utils.data import read_nlp, read_reviews
+from utils.queries import (
+    apply_filters, average_price, phrase_counts, price_tier_metrics, score_correlations,
+    topic_distribution,
+)
+
+# Render off-screen; no figures exist yet so switching backends is safe
+matplotlib.use("Agg")
+
+# Datasets and aggregates shared by every job in a process
+_STATE = {}
+
+
+def load_state():
+    reviews = read_reviews()
+    return {
+        'reviews': reviews,
+        'nlp': read_nlp(),
+        'avg_price': average_price(reviews),
+    }
+
+
+def _init_worker(state):
+    if state is not None:
+        _STATE.update(state)
+
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+# =========================
+# One report
+# =========================
+
+def _save_plotly(fig, path):
+    fig.write_html(path, include_plotlyjs='cdn', full_html=True)
+
+
+def _save_matplotlib(fig, path):
+    fig.savefig(path, dpi=100, bbox_inches='tight')
+    plt.close(fig)
+
+
+def render_report(neighbourhood, room_type, out_dir, n_tiers=4):
+    """Render every chart for one neighbourhood (and room type) into ``out_dir``.
+
+    Returns ``(neighbourhood, room_type, files, skipped, seconds)``; charts
+    without enough data are listed in ``skipped`` instead of failing the job.
+    """
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    filters = dict(
+        neighbourhoods=(neighbourhood,),
+        room_types=(room_type,) if room_type else None,
+    )
+    reviews = apply_filters(_STATE['reviews'], **filters)
+    nlp = apply_filters(_STATE['nlp'], **filters)
+    avg_price = apply_filters(_STATE['avg_price'], **filters)
+
+    charts = [
+        ("average_price.html", _save_plotly, lambda: average_price_bar(avg_price), not avg_price.empty),
+        ("price_histogram.html", _save_plotly, lambda: price_histogram_chart(reviews), not reviews.empty),
+        ("price_box.html", _save_plotly, lambda: price_box(reviews), not reviews.empty),
+        ("topic_radar.html", _save_plotly, lambda: topic_radar(topic_distribution(nlp)), not nlp.empty),
+        ("wordcloud.png", _save_matplotlib, lambda: _wordcloud_chart(nlp), not nlp.empty),
+        ("price_tier_rating.png", _save_matplotlib, lambda: _tier_chart(nlp, n_tiers, 'avg_rating'), len(nlp) >= n_tiers),
+        ("price_tier_sentiment.png", _save_matplotlib, lambda: _tier_chart(nlp, n_tiers, 'avg_sentiment'), len(nlp) >= n_tiers),
+        ("score_correlations.png", _save_matplotlib, lambda: _correlation_chart(nlp), len(nlp) > 1),
+    ]
+
+    files, skipped = [], []
+    for name, save, build, has_data in charts:
+        if not has_data:
+            skipped.append(name)
+            continue
+        try:
+            save(build(), os.path.join(out_dir, name))
+            files.append(name)
+        except (ValueError, SyntaxError):
+            # e.g. too few reviews for LDA's min_df, duplicate qcut edges or a malformed phrase list
+            skipped.append(name)
+            plt.close('all')
+
+    return neighbourhood, room_type, files, skipped, time.perf_counter() - start
+
+
+def _tier_chart(nlp, n_tiers, metric):
+    tiers = price_tier_metrics(nlp, n_tiers)
+    title, vmin, vmax = {
+        'avg_rating': ("Average Rating", 4.6, 5.0),
+        'avg_sentiment': ("Average Sentiment", 0.65, 0.85),
+    }[metric]
+    return tier_heatmap(tiers[metric], list(tiers.index), title, vmin=vmin, vmax=vmax)
+
+
+def _wordcloud_chart(nlp):
+    phrases = phrase_counts(nlp)
+    if not phrases:
+        raise ValueError("no adjective-noun phrases")
+    return phrase_wordcloud(phrases)
+
+
+def _correlation_chart(nlp):
+    corr, labels = score_correlations(nlp)
+    if corr is None:
+        raise ValueError("not enough review sub-score columns")
+    return correlation_heatmap(corr, labels)
+
+
+# =========================
+# Batch run
+# =========================
+
+def write_index(out, results):
+    rows = []
+    for neighbourhood, room_type, files, skipped, _ in sorted(results, key=lambda r: (r[0], r[1] or "")):
+        rel = os.path.relpath(_report_dir(out, neighbourhood, room_type), out)
+        links = " · ".join(f'<a href="{html.escape(rel)}/{f}">{html.escape(f)}</a>' for f in files)
+        title = html.escape(neighbourhood + (f" — {room_type}" if room_type else ""))
+        rows.append(f"<li><b>{title}</b>: {links or '<i>no charts</i>'}</li>")
+    with open(os.path.join(out, "index.html"), "w") as f:
+        f.write("<!doctype html><meta charset='utf-8'><title>Neighbourhood Reports</title>"
+                "<h1>Airbnb Neighbourhood Reports</h1><ul>" + "\n".join(rows) + "</ul>")
+
+
+def _report_dir(out, neighbourhood, room_type):
+    path = os.path.join(out, slugify(neighbourhood))
+    return os.path.join(path, slugify(room_type)) if room_type else path
+
+
+def run(out="reports", workers=None, by_room_type=False, neighbourhoods=None, n_tiers=4):
+    state = load_state()
+    _STATE.update(state)
+
+    reviews = state['reviews']
+    neighbourhoods = neighbourhoods or sorted(reviews['neighbourhood'].dropna().unique())
+    room_types = sorted(reviews['room_type'].dropna().unique()) if by_room_type else []
+    jobs = [(n, None) for n in neighbourhoods] + [(n, r) for n in neighbourhoods for r in room_types]
+
+    # fork shares the loaded state with the workers; it is only safe on Linux
+    # (macOS system libraries may crash in forked children), so elsewhere
+    # spawned workers get the state pickled once per worker
+    fork = sys.platform == "linux"
+    context = multiprocessing.get_context("fork" if fork else "spawn")
+
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context,
+        initializer=_init_worker, initargs=(None if fork else state,),
+    ) as pool:
+        futures = [
+            pool.submit(render_report, n, r, _report_dir(out, n, r), n_tiers)
+            for n, r in jobs
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            neighbourhood, room_type, files, skipped, seconds = result
+            label = neighbourhood + (f" / {room_type}" if room_type else "")
+            note = f", skipped {', '.join(skipped)}" if skipped else ""
+            print(f"[{len(results)}/{len(jobs)}] {label}: {len(files)} charts in {seconds:.1f}s{note}")
+
+    write_index(out, results)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render every chart for every neighbourhood.")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--by-room-type", action="store_true", help="also render one report per room type")
+    parser.add_argument("--neighbourhood", action="append", help="limit to these neighbourhoods (repeatable)")
+    parser.add_argument("--tiers", type=int, default=4, help="number of price tiers in the heatmaps")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run(args.out, args.workers, args.by_room_type, args.neighbourhood, args.tiers)
+    print(f"{len(results)} reports written to {args.out}/ in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
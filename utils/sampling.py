@@ -0,0 +1,87 @@
+"""Stratified samples and sampling error bounds for approximate views.
+
+A plain ``df.sample(n)`` can leave small neighbourhoods out entirely; these
+samples allocate rows to every neighbourhood × room type stratum in
+proportion to its size, with at least one row each. Small strata are
+therefore over-represented; estimate shares from such a sample with
+``stratified_shares``, which weights each stratum by its population size.
+"""
+import numpy as np
+import pandas as pd
+
+STRATA = ['neighbourhood', 'room_type']
+Z_95 = 1.96
+
+
+def stratified_sample(df, n, strata=STRATA, random_state=42):
+    """About ``n`` rows of ``df`` allocated proportionally across ``strata``.
+
+    Allocation uses largest remainders, so the total is exactly ``n`` unless
+    there are more strata than rows to give (each stratum still gets one).
+    ``df`` is returned unchanged when it has ``n`` rows or fewer.
+    """
+    if n is None or len(df) <= n:
+        return df
+    strata = [c for c in strata if c in df.columns]
+    if not strata:
+        return df.sample(n, random_state=random_state)
+
+    groups = df.groupby(strata, observed=True, dropna=False, sort=False).indices
+    positions = list(groups.values())
+    sizes = np.array([len(p) for p in positions])
+
+    quota = sizes * n / len(df)
+    alloc = np.clip(np.floor(quota).astype(int), 1, sizes)
+    remaining = n - alloc.sum()
+    if remaining > 0:
+        room = alloc < sizes
+        order = np.argsort(-(quota - np.floor(quota)) * room, kind="stable")
+        alloc[order[:remaining]] += room[order[:remaining]]
+
+    rng = np.random.default_rng(random_state)
+    picked = np.concatenate([rng.choice(p, k, replace=False) for p, k in zip(positions, alloc)])
+    return df.iloc[np.sort(picked)]
+
+
+def share_bounds(counts, n, population=None, z=Z_95):
+    """Normal-approximation bounds on shares estimated from ``n`` sampled rows.
+
+    ``counts`` are per-category counts in the sample; returns ``(low, high)``
+    share arrays clipped to [0, 1], with the finite population correction
+    when ``population`` is given.
+    """
+    p = np.asarray(counts, dtype=float) / max(n, 1)
+    se = np.sqrt(p * (1 - p) / max(n, 1))
+    if population and population > 1:
+        se *= np.sqrt(max(population - n, 0) / (population - 1))
+    return np.clip(p - z * se, 0, 1), np.clip(p + z * se, 0, 1)
+
+
+def stratified_shares(sample, df, labels, n_categories, strata=STRATA, z=Z_95):
+    """Category shares of ``df`` estimated from its ``stratified_sample``.
+
+    ``labels`` holds the category (0 .. ``n_categories`` - 1) of each
+    sampled row. Each stratum's shares are weighted by its size in ``df``,
+    and the bounds use the stratified variance with a per-stratum finite
+    population correction. Returns ``(share, low, high)`` arrays.
+    """
+    labels = np.asarray(labels)
+    cols = [c for c in strata if c in df.columns]
+    if not cols:
+        counts = np.bincount(labels, minlength=n_categories)
+        low, high = share_bounds(counts, len(sample), population=len(df), z=z)
+        return counts / max(len(sample), 1), low, high
+
+    population = df.groupby(cols, observed=True, dropna=False).size()
+    by = pd.DataFrame(np.eye(n_categories)[labels], index=sample.index).groupby(
+        [sample[c] for c in cols], observed=True, dropna=False
+    )
+    p_h = by.mean().to_numpy()
+    n_h = by.size().to_numpy()
+    N_h = population.reindex(by.size().index).to_numpy(dtype=float)
+    weights = N_h / N_h.sum()
+
+    share = weights @ p_h
+    var_h = (weights ** 2 * (1 - n_h / N_h) / np.maximum(n_h - 1, 1))[:, None] * p_h * (1 - p_h)
+    se = np.sqrt(var_h.sum(axis=0))
+    return share, np.clip(share - z * se, 0, 1), np.clip(share + z * se, 0, 1)
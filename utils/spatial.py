@@ -0,0 +1,110 @@
+"""Spatial grid index over listing coordinates.
+
+Listings are bucketed into fixed-size latitude/longitude cells so that
+viewport (bounding-box) and radius queries only look at the cells that
+overlap the query area instead of scanning every row.
+"""
+import math
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_000.0
+
+# deck.gl / Mapbox use 512px tiles: one tile spans 360 degrees at zoom 0
+TILE_SIZE_PX = 512
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres (vectorised over numpy arrays)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def viewport_bounds(lat, lon, zoom, width_px=1200, height_px=500):
+    """Approximate (south, west, north, east) bounds of a map view.
+
+    Uses the Web Mercator scale at the view centre, which is accurate enough
+    for city-sized views.
+    """
+    deg_per_px = 360.0 / (TILE_SIZE_PX * 2 ** zoom)
+    half_lon = deg_per_px * width_px / 2
+    half_lat = deg_per_px * height_px / 2 * math.cos(math.radians(lat))
+    return lat - half_lat, lon - half_lon, lat + half_lat, lon + half_lon
+
+
+def radius_bounds(lat, lon, radius_m):
+    """(south, west, north, east) box enclosing the circle of ``radius_m`` metres around (lat, lon)."""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+class GridIndex:
+    """Bucket points into a regular lat/lon grid for fast spatial lookups.
+
+    Points are stored sorted by cell id (row-major), so every grid row of a
+    query rectangle maps to one contiguous slice of ``order``, found by
+    binary search over the occupied cells only: memory stays proportional
+    to the number of points even if a stray coordinate (e.g. 0, 0) stretches
+    the grid far beyond the city. Queries return sorted positional indices
+    into the arrays the index was built from.
+    """
+
+    def __init__(self, lat, lon, cell_deg=0.005):
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.cell_deg = cell_deg
+
+        if len(self.lat) == 0:
+            self.lat0 = self.lon0 = 0.0
+            self.n_rows = self.n_cols = 1
+        else:
+            self.lat0 = self.lat.min()
+            self.lon0 = self.lon.min()
+            self.n_rows = int((self.lat.max() - self.lat0) // cell_deg) + 1
+            self.n_cols = int((self.lon.max() - self.lon0) // cell_deg) + 1
+
+        rows = ((self.lat - self.lat0) // cell_deg).astype(np.int64)
+        cols = ((self.lon - self.lon0) // cell_deg).astype(np.int64)
+        cell_ids = rows * self.n_cols + cols
+
+        self.order = np.argsort(cell_ids, kind="stable")
+        # cell id of each entry of `order`; a cell's points are one contiguous run
+        self.cell_ids = cell_ids[self.order]
+
+    def __len__(self):
+        return len(self.lat)
+
+    def _cell_range(self, value, origin, n_cells):
+        return min(max(int((value - origin) // self.cell_deg), 0), n_cells - 1)
+
+    def _candidates(self, south, west, north, east):
+        if len(self) == 0 or north < self.lat0 or east < self.lon0:
+            return np.empty(0, dtype=np.int64)
+
+        r0 = self._cell_range(south, self.lat0, self.n_rows)
+        r1 = self._cell_range(north, self.lat0, self.n_rows)
+        c0 = self._cell_range(west, self.lon0, self.n_cols)
+        c1 = self._cell_range(east, self.lon0, self.n_cols)
+
+        row_starts = np.arange(r0, r1 + 1, dtype=np.int64) * self.n_cols
+        lo = np.searchsorted(self.cell_ids, row_starts + c0, side="left")
+        hi = np.searchsorted(self.cell_ids, row_starts + c1, side="right")
+        return np.concatenate([self.order[a:b] for a, b in zip(lo, hi)])
+
+    def query_bbox(self, south, west, north, east):
+        """Positions of points inside the (south, west, north, east) box."""
+        idx = self._candidates(south, west, north, east)
+        lat, lon = self.lat[idx], self.lon[idx]
+        mask = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        return np.sort(idx[mask])
+
+    def query_radius(self, lat, lon, radius_m):
+        """Positions of points within ``radius_m`` metres of (lat, lon)."""
+        idx = self._candidates(*radius_bounds(lat, lon, radius_m))
+        dist = haversine_m(lat, lon, self.lat[idx], self.lon[idx])
+        return np.sort(idx[dist <= radius_m])
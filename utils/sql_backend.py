@@ -0,0 +1,374 @@
+"""Optional SQLite backend: an indexed on-disk copy of the data for pushed-down queries.
+
+Build (or refresh) the database from every city / borough partition with::
+
+    python -m utils.sql_backend
+
+then start the app with ``AIRBNB_BACKEND=sqlite``. Price Insights and Map
+Exploration then send their filters, bounding boxes and group-bys to SQLite
+instead of loading the data frame, so several worker processes share one
+on-disk store through the OS page cache and only query results are held in
+memory. Review Trends reads its stored monthly aggregates either way
+(``utils.aggregates``). Comparable Listings, Host Portfolios and Review
+Narratives build in-memory indexes and models over the whole frame, so they
+still load it: the largest city / borough selection must fit in memory.
+
+Tables ``reviews`` (``airbnb_cleaned.csv``) and ``nlp``
+(``airbnb_nlp_processes.csv``) hold every partition's rows plus ``city`` and
+``borough`` columns, indexed on ``INDEX_COLUMNS``. A refresh only reloads
+partitions whose source file changed and drops those no longer in data/;
+columns a partition adds are appended to the table. The database lives at
+``data/airbnb.sqlite`` (override with ``AIRBNB_SQLITE_PATH``).
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.data import DATA_DIR, clean_price, dataset_version, discover_partitions
+from utils.queries import FILTER_COLUMNS
+
+BACKEND = os.environ.get("AIRBNB_BACKEND", "pandas").lower()
+SQLITE_PATH = os.environ.get("AIRBNB_SQLITE_PATH", os.path.join(DATA_DIR, "airbnb.sqlite"))
+
+# Table -> partition file attribute
+TABLES = {'reviews': 'listings_path', 'nlp': 'nlp_path'}
+INDEX_COLUMNS = [
+    'neighbourhood', 'room_type', 'price', 'review_date', 'listing_id', 'latitude', 'longitude',
+    'review_scores_rating',
+]
+# Listing-level map columns (``utils.views.map_view``), as named on the page
+MAP_COLUMNS = {
+    'listing_name': 'listing_name',
+    'neighbourhood': 'neighbourhood',
+    'room_type': 'Room Type',
+    'price': 'price',
+    'review_scores_rating': 'rating',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+}
+CHUNK_ROWS = 100_000
+
+
+def sql_enabled():
+    return BACKEND == "sqlite"
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+# =========================
+# Build / refresh
+# =========================
+
+def _table_exists(conn, table):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def _sql_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _add_missing_columns(conn, table, chunk):
+    """Add ``chunk`` columns the table lacks; rows loaded earlier get NULL there."""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for col in chunk.columns:
+        if col not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(col)} {_sql_type(chunk[col].dtype)}")
+
+
+def _delete_partition(conn, table, city, borough):
+    if _table_exists(conn, table):
+        conn.execute(f"DELETE FROM {table} WHERE city = ? AND borough = ?", (city, borough))
+    conn.execute("DELETE FROM sources WHERE tbl = ? AND city = ? AND borough = ?", (table, city, borough))
+
+
+def _load_partition(conn, table, partition, path):
+    _delete_partition(conn, table, partition.city, partition.borough)
+    rows = 0
+    for chunk in pd.read_csv(path, chunksize=CHUNK_ROWS):
+        if 'price' in chunk.columns:
+            chunk['price'] = clean_price(chunk['price'])
+        chunk = chunk.assign(city=partition.city, borough=partition.borough)
+        # The first chunk creates the table with its column types; later
+        # partitions may bring extra columns (and miss some, left NULL)
+        if _table_exists(conn, table):
+            _add_missing_columns(conn, table, chunk)
+        chunk.to_sql(table, conn, if_exists='append', index=False)
+        rows += len(chunk)
+    return rows
+
+
+def build(path=SQLITE_PATH, partitions=None):
+    """Create or refresh the database from ``partitions`` (default: all found in data/).
+
+    Partitions whose source file version is unchanged are skipped. On a full
+    refresh (no ``partitions`` given) partitions that are no longer on disk
+    are deleted; an empty ``partitions`` list is rejected.
+    """
+    if partitions is not None and not partitions:
+        raise ValueError("no partitions to build; pass None to build every partition in data/")
+    full = partitions is None
+    if full:
+        partitions = [p for ps in discover_partitions().values() for p in ps]
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sources "
+            "(tbl TEXT, city TEXT, borough TEXT, version TEXT, PRIMARY KEY (tbl, city, borough))"
+        )
+        for table, attr in TABLES.items():
+            if full:
+                present = {(p.city, p.borough) for p in partitions if os.path.exists(getattr(p, attr))}
+                known = conn.execute("SELECT city, borough FROM sources WHERE tbl = ?", (table,)).fetchall()
+                for city, borough in set(known) - present:
+                    with conn:
+                        _delete_partition(conn, table, city, borough)
+                    print(f"{table}: {city} / {borough}: removed")
+
+            for partition in partitions:
+                source = getattr(partition, attr)
+                if not os.path.exists(source):
+                    continue
+                version = dataset_version(source)
+                known = conn.execute(
+                    "SELECT version FROM sources WHERE tbl = ? AND city = ? AND borough = ?",
+                    (table, partition.city, partition.borough),
+                ).fetchone()
+                if known and known[0] == version and _table_exists(conn, table):
+                    continue
+
+                start = time.perf_counter()
+                with conn:
+                    rows = _load_partition(conn, table, partition, source)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                        (table, partition.city, partition.borough, version),
+                    )
+                print(f"{table}: {partition.city} / {partition.borough}: {rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+            if _table_exists(conn, table):
+                columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                with conn:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_city ON {table} (city, borough)")
+                    for col in (c for c in INDEX_COLUMNS if c in columns):
+                        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{col} ON {table} ({_quote(col)})")
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+# =========================
+# Queries
+# =========================
+
+def _and(where, condition):
+    return f"{where} AND {condition}" if where else f" WHERE {condition}"
+
+
+def _quantile(q):
+    """Linearly interpolated ``q`` quantile of ``price`` over ranked rows ``i`` of ``n``."""
+    pos = f"({q} * (n - 1))"
+    low = f"CAST({pos} AS INTEGER)"
+    return (
+        f"SUM(CASE WHEN i = {low} THEN price * (1 - ({pos} - {low})) "
+        f"WHEN i = {low} + 1 THEN price * ({pos} - {low}) ELSE 0 END)"
+    )
+
+
+def where_clause(city=None, boroughs=None, columns=None, **filters):
+    """SQL ``WHERE`` clause and parameters for ``filter_mask``-style filters."""
+    columns = {**FILTER_COLUMNS, **(columns or {})}
+    clauses, params = [], []
+    if city:
+        clauses.append("city = ?")
+        params.append(city)
+    if boroughs:
+        clauses.append(f"borough IN ({', '.join('?' * len(boroughs))})")
+        params.extend(boroughs)
+    for name, value in filters.items():
+        if value is None:
+            continue
+        col = _quote(columns[name])
+        if name.endswith('_range'):
+            clauses.append(f"{col} BETWEEN ? AND ?")
+            params.extend([float(value[0]), float(value[1])])
+        else:
+            clauses.append(f"{col} IN ({', '.join('?' * len(value))})")
+            params.extend(value)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+class SqlBackend:
+    """Read-only query interface over the built database (one connection per thread)."""
+
+    def __init__(self, path=SQLITE_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; build it with `python -m utils.sql_backend`")
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def version(self):
+        """Changes whenever the database is rebuilt or refreshed."""
+        stat = os.stat(self.path)
+        return f"{os.path.basename(self.path)}-{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            # memory-map the file: pages are shared by every process reading it
+            conn.execute("PRAGMA mmap_size = 268435456")
+            self._local.conn = conn
+        return conn
+
+    def query(self, sql, params=()):
+        return pd.read_sql_query(sql, self._conn(), params=params)
+
+    def filter_options(self, city=None, boroughs=None, table='reviews'):
+        """Same as ``utils.filters.filter_options``, computed in SQL."""
+        where, params = where_clause(city, boroughs)
+        options = {}
+        for col, key in [('neighbourhood', 'neighbourhoods'), ('room_type', 'room_types')]:
+            values = self.query(f"SELECT DISTINCT {col} FROM {table}{where}", params)[col]
+            options[key] = sorted(values.dropna())
+        low, high = self._conn().execute(f"SELECT MIN(price), MAX(price) FROM {table}{where}", params).fetchone()
+        options['price_min'], options['price_max'] = int(low or 0), int(high or 0)
+        return options
+
+    def average_price(self, city=None, boroughs=None, table='reviews', **filters):
+        """``utils.queries.average_price`` as a ``GROUP BY``."""
+        where, params = where_clause(city, boroughs, **filters)
+        return self.query(
+            f"SELECT neighbourhood, room_type, AVG(price) AS price FROM {table}{where} "
+            "GROUP BY neighbourhood, room_type ORDER BY neighbourhood, room_type",
+            params,
+        )
+
+    def price_histogram(self, city=None, boroughs=None, bins=50, price_range=None, table='reviews', **filters):
+        """``utils.queries.price_histogram`` with the binning done in SQL."""
+        where, params = where_clause(city, boroughs, price_range=price_range, **filters)
+        if price_range is None:
+            low, high = self._conn().execute(f"SELECT MIN(price), MAX(price) FROM {table}{where}", params).fetchone()
+            low, high = (low or 0.0), (high or 1.0)
+        else:
+            low, high = map(float, price_range)
+        width = (high - low) / bins or 1.0
+        counts = self.query(
+            f"SELECT MIN(CAST((price - ?) / ? AS INTEGER), ?) AS bin, COUNT(*) AS count "
+            f"FROM {table}{_and(where, 'price IS NOT NULL')} GROUP BY bin",
+            [low, width, bins - 1] + params,
+        )
+        full = np.zeros(bins, dtype=int)
+        full[counts['bin'].to_numpy(dtype=int)] = counts['count'].to_numpy()
+        edges = low + width * np.arange(bins + 1)
+        return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': full})
+
+    def _columns(self, table):
+        return {row[1] for row in self._conn().execute(f"PRAGMA table_info({table})")}
+
+    def map_centres(self, city=None, boroughs=None, table='reviews'):
+        """Mean position of the area and of each neighbourhood (``latitude``, ``longitude``)."""
+        where, params = where_clause(city, boroughs)
+        where = _and(_and(where, "latitude IS NOT NULL"), "longitude IS NOT NULL")
+        area = self._conn().execute(f"SELECT AVG(latitude), AVG(longitude) FROM {table}{where}", params).fetchone()
+        centroids = self.query(
+            f"SELECT neighbourhood, AVG(latitude) AS latitude, AVG(longitude) AS longitude "
+            f"FROM {table}{_and(where, 'neighbourhood IS NOT NULL')} GROUP BY neighbourhood ORDER BY neighbourhood",
+            params,
+        ).set_index('neighbourhood')
+        return tuple(area), centroids
+
+    def map_rows(self, city=None, boroughs=None, bbox=None, table='reviews', **filters):
+        """``utils.views.map_view`` rows matching the filters, selected in SQL.
+
+        Rows missing a map column or outside ``bbox`` (south, west, north,
+        east) are skipped and each listing keeps its latest review, as in
+        ``map_view``; the filters then apply to those rows.
+        Columns are named as on the map page (``Room Type``, ``rating``).
+        """
+        available = self._columns(table)
+        columns = [c for c in MAP_COLUMNS if c in available]
+        select = ", ".join(_quote(c) for c in columns)
+
+        where, params = where_clause(city, boroughs)
+        for col in ['latitude', 'longitude', 'price', 'room_type', 'neighbourhood', 'review_scores_rating']:
+            where = _and(where, f"{col} IS NOT NULL")
+        if bbox is not None:
+            # a listing's coordinates are the same on every review: bound them before deduplicating
+            south, west, north, east = map(float, bbox)
+            where = _and(where, "latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?")
+            params = params + [south, north, west, east]
+        filter_where, filter_params = where_clause(**filters)
+        params = params + filter_params
+        if {'listing_id', 'review_date'} <= available:
+            # latest review per listing, then the filters
+            source = (
+                f"(SELECT {select}, ROW_NUMBER() OVER (PARTITION BY listing_id ORDER BY review_date DESC) AS rn "
+                f"FROM {table}{where})"
+            )
+            outer = _and(filter_where, "rn = 1")
+        else:
+            source = table
+            outer = where + filter_where.replace(" WHERE ", " AND ", 1)
+
+        rows = self.query(f"SELECT {select} FROM {source}{outer}", params)
+        return rows.rename(columns=MAP_COLUMNS)
+
+    def price_box_stats(self, city=None, boroughs=None, table='reviews', **filters):
+        """Box-plot statistics of price per neighbourhood and room type, computed in SQL.
+
+        Quartiles use linear interpolation (as ``numpy.percentile``); the
+        fences are the most extreme prices within 1.5 IQR of the box.
+        Returns ``neighbourhood``, ``room_type``, ``n``, ``q1``, ``median``,
+        ``q3``, ``lowerfence`` and ``upperfence``.
+        """
+        where, params = where_clause(city, boroughs, **filters)
+        return self.query(
+            f"""
+            WITH ranked AS (
+                SELECT neighbourhood, room_type, price,
+                       ROW_NUMBER() OVER (PARTITION BY neighbourhood, room_type ORDER BY price) - 1 AS i,
+                       COUNT(*) OVER (PARTITION BY neighbourhood, room_type) AS n
+                FROM {table}{_and(where, "price IS NOT NULL")}
+            ),
+            quartiles AS (
+                SELECT neighbourhood, room_type, MAX(n) AS n,
+                       {_quantile(0.25)} AS q1, {_quantile(0.5)} AS median, {_quantile(0.75)} AS q3
+                FROM ranked GROUP BY neighbourhood, room_type
+            )
+            SELECT q.neighbourhood, q.room_type, q.n, q.q1, q.median, q.q3,
+                   MIN(r.price) AS lowerfence, MAX(r.price) AS upperfence
+            FROM quartiles q JOIN ranked r
+              ON r.neighbourhood = q.neighbourhood AND r.room_type = q.room_type
+            WHERE r.price BETWEEN q.q1 - 1.5 * (q.q3 - q.q1) AND q.q3 + 1.5 * (q.q3 - q.q1)
+            GROUP BY q.neighbourhood, q.room_type
+            ORDER BY q.neighbourhood, q.room_type
+            """,
+            params,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or refresh the SQLite copy of the data.")
+    parser.add_argument("--db", default=SQLITE_PATH, help="database path")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    build(args.db)
+    print(f"{args.db} up to date in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
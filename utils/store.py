@@ -0,0 +1,189 @@
+"""Process-wide, read-only datasets shared by every session.
+
+Data is partitioned by city and borough (``data/<city>/<borough>/``, see
+``utils.data.discover_partitions``). Only the partitions of the selected
+city (and boroughs) are loaded, from the persistent disk cache when
+available, and the assembled frames are kept in one process-wide LRU bounded
+by their in-memory size, together with the per-city views built from them
+(map rows, search and nearest-neighbour indexes, host portfolios, see
+``shared_view``): a city nobody has looked at lately is evicted rather than
+holding memory forever. The budget is ``AIRBNB_MEMORY_BUDGET_MB`` (default
+4096) less the share given to the disk cache's in-process tier (see
+``utils.memory``). Nothing else keeps these objects alive: that tier skips
+them. Concurrent sessions asking for the same missing
+entry wait for one build instead of each building it. With
+``AIRBNB_WARM_UP=1`` the server fills this cache with the default city's
+views in a background thread once this module is first imported
+(``utils.warmup``). With ``AIRBNB_BACKEND=sqlite``
+pages that support it query the SQLite copy (``shared_sql``) instead.
+
+Concurrent sessions all reference the same cached frame instead of holding
+their own copies. pandas copy-on-write is switched on, so filters,
+``assign`` and other derived frames share column memory with the base data
+and only copy a column if something writes to it.
+
+The ``shared_*`` accessors hand out a shallow copy-on-write view of the
+cached frame: it costs a few objects, not a copy of the data, and writing to
+it (even ``view['col'] = ...``) can never leak into other sessions. Pages
+should still prefer ``assign`` for derived columns.
+"""
+import os
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+
+import pandas as pd
+import streamlit as st
+
+from utils.data import DEFAULT_CITY, discover_partitions
+from utils.memory import FRAMES_BUDGET, memory_size
+from utils.sql_backend import SQLITE_PATH, SqlBackend, sql_enabled
+from utils.views import dataset_key, load_partitions, partition_sources
+
+pd.set_option("mode.copy_on_write", True)
+
+WARM_UP = os.environ.get("AIRBNB_WARM_UP", "0") == "1"
+
+SPINNERS = {
+    'reviews': "Loading listings…",
+    'listings': "Loading listings…",
+    'nlp': "Loading review text…",
+}
+
+
+class FrameCache:
+    """Thread-safe LRU of loaded frames and views, bounded by their deep memory usage.
+
+    The most recently used entry is always kept, even if it alone exceeds
+    the budget.
+    """
+
+    def __init__(self, max_bytes=FRAMES_BUDGET):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._building = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, frame):
+        size = memory_size(frame)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            self._entries[key] = (frame, size)
+            self._bytes += size
+            while len(self._entries) > 1 and self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+        return frame
+
+    def get_or_build(self, key, build):
+        """The entry for ``key``, built once by ``build()`` however many threads ask for it."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            value = self.get(key)
+            if value is None:
+                value = self.put(key, build())
+        with self._lock:
+            self._building.pop(key, None)
+        return value
+
+
+@st.cache_resource
+def frame_cache():
+    return FrameCache()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def available_partitions():
+    """City -> partitions currently on disk (re-scanned every minute)."""
+    return discover_partitions()
+
+
+def city_partitions(city=None, boroughs=None):
+    """Partitions of ``city`` (default: New York City), limited to ``boroughs`` if given."""
+    cities = available_partitions()
+    partitions = cities.get(city) or cities.get(DEFAULT_CITY) or next(iter(cities.values()), [])
+    if boroughs:
+        partitions = [p for p in partitions if p.borough in boroughs]
+    return tuple(partitions)
+
+
+def _cached(key, build, spinner=None):
+    cache = frame_cache()
+    value = cache.get(key)
+    if value is None:
+        with st.spinner(spinner) if spinner else nullcontext():
+            value = cache.get_or_build(key, build)
+    return value
+
+
+def load_shared(kind, city=None, boroughs=None, spinner=None):
+    """The cached frame of ``kind`` (not a copy) and its dataset key."""
+    sources = partition_sources(kind, city_partitions(city, boroughs))
+    key = dataset_key(kind, sources)
+    return _cached(key, lambda: load_partitions(kind, sources), spinner), key
+
+
+def _shared(kind, city, boroughs):
+    frame, key = load_shared(kind, city, boroughs, SPINNERS[kind])
+    return frame.copy(deep=False), key
+
+
+def shared_view(name, dataset_key, build, spinner="Loading…"):
+    """A per-dataset view (``build()``), kept in the same memory-budgeted LRU as the frames."""
+    return _cached((name, dataset_key), build, spinner)
+
+
+def shared_reviews(city=None, boroughs=None):
+    """Review-level listing data (``airbnb_cleaned.csv``) and its dataset key."""
+    return _shared('reviews', city, boroughs)
+
+
+def shared_listings(city=None, boroughs=None):
+    """One row per listing (latest review kept) and its dataset key."""
+    return _shared('listings', city, boroughs)
+
+
+def shared_nlp(city=None, boroughs=None):
+    """NLP-processed reviews (``airbnb_nlp_processes.csv``) and its dataset key."""
+    return _shared('nlp', city, boroughs)
+
+
+@st.cache_resource(show_spinner=False)
+def _sql_backend(path):
+    return SqlBackend(path)
+
+
+def shared_sql():
+    """The SQLite backend if ``AIRBNB_BACKEND=sqlite`` and the database is built, else ``None``.
+
+    The missing-database fallback is checked on every run (not cached), so
+    building the database takes effect without restarting the app.
+    """
+    if not sql_enabled():
+        return None
+    if not os.path.exists(SQLITE_PATH):
+        st.warning(f"⚠️ {SQLITE_PATH} not found; build it with `python -m utils.sql_backend`. Falling back to in-memory data.")
+        return None
+    return _sql_backend(SQLITE_PATH)
+
+
+# Opt-in: warm the default views into this process's caches (utils.warmup
+# imports this module, so it is imported here, after everything is defined)
+if WARM_UP:
+    from utils.warmup import start_warm_up
+    start_warm_up()
@@ -0,0 +1,190 @@
+"""Inverted index and BM25 search over review text.
+
+The index maps every term to its postings in CSR layout (as ``GridIndex``
+does for map cells): per-document term frequencies for ranking, and
+per-occurrence positions for phrase queries. Documents are row positions of
+the indexed frame, so hits intersect directly with ``filter_positions``.
+
+Queries are AND-ed terms and quoted phrases, e.g. ``noise "bed bugs"``; a
+bare word that tokenizes to several tokens (``check-in``) is a phrase.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+TOKEN_RE = r"[a-z0-9]+(?:'[a-z]+)?"
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Positions are stored as uint16; longer reviews share the last position
+MAX_POSITION = np.iinfo(np.uint16).max
+
+
+def tokenize(text):
+    return re.findall(TOKEN_RE, text.lower())
+
+
+def parse_query(query):
+    """Query clauses as token tuples: one per bare term, one per phrase."""
+    clauses = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        tokens = tuple(tokenize(phrase or word))
+        if tokens and tokens not in clauses:
+            clauses.append(tokens)
+    return clauses
+
+
+class TextIndex:
+    """Positional inverted index over a sequence of texts."""
+
+    def __init__(self, texts):
+        tokens = pd.Series(np.asarray(texts, dtype=object)).fillna("").astype(str).str.lower().str.findall(TOKEN_RE)
+        self.doc_len = tokens.str.len().to_numpy(np.int32)
+        self.avg_len = max(float(self.doc_len.mean()), 1.0) if len(self.doc_len) else 1.0
+
+        flat = tokens.explode().dropna()
+        docs = flat.index.to_numpy(np.int32)
+        positions = flat.groupby(level=0).cumcount().to_numpy()
+        term_ids, vocab = pd.factorize(flat.to_numpy())
+        self.vocabulary = {term: i for i, term in enumerate(vocab)}
+
+        # Occurrences sorted by term; docs and positions stay ascending within a term
+        order = np.argsort(term_ids, kind="stable")
+        terms = term_ids[order]
+        self.occ_docs = docs[order]
+        self.occ_pos = np.minimum(positions[order], MAX_POSITION).astype(np.uint16)
+        self.occ_starts = _starts(terms, len(vocab))
+
+        # Document postings: one entry per (term, doc) with its term frequency
+        new = np.ones(len(terms), dtype=bool)
+        new[1:] = (terms[1:] != terms[:-1]) | (self.occ_docs[1:] != self.occ_docs[:-1])
+        first = np.flatnonzero(new)
+        self.post_docs = self.occ_docs[first]
+        self.post_tf = np.diff(np.append(first, len(terms))).astype(np.int32)
+        self.post_starts = _starts(terms[first], len(vocab))
+
+    @property
+    def n_docs(self):
+        return len(self.doc_len)
+
+    def _postings(self, term_id):
+        lo, hi = self.post_starts[term_id], self.post_starts[term_id + 1]
+        return self.post_docs[lo:hi], self.post_tf[lo:hi]
+
+    def _occurrences(self, term_id, docs):
+        lo, hi = self.occ_starts[term_id], self.occ_starts[term_id + 1]
+        occ_docs, occ_pos = self.occ_docs[lo:hi], self.occ_pos[lo:hi]
+        keep = np.isin(occ_docs, docs)
+        return occ_docs[keep], occ_pos[keep]
+
+    def clause_postings(self, tokens):
+        """Sorted matching docs and their match counts for a term or phrase."""
+        empty = np.array([], dtype=np.int32), np.array([], dtype=np.int32)
+        term_ids = [self.vocabulary.get(t) for t in tokens]
+        if any(t is None for t in term_ids):
+            return empty
+        if len(term_ids) == 1:
+            return self._postings(term_ids[0])
+
+        docs = self._postings(term_ids[0])[0]
+        for term_id in term_ids[1:]:
+            docs = np.intersect1d(docs, self._postings(term_id)[0], assume_unique=True)
+        if not len(docs):
+            return empty
+
+        # Phrase starts: (doc, position) of the first token followed by every other token in order
+        occ_docs, occ_pos = self._occurrences(term_ids[0], docs)
+        starts = (occ_docs.astype(np.int64) << 16) | occ_pos
+        for offset, term_id in enumerate(term_ids[1:], start=1):
+            occ_docs, occ_pos = self._occurrences(term_id, docs)
+            shifted = occ_pos.astype(np.int64) - offset
+            ok = shifted >= 0
+            starts = starts[np.isin(starts, (occ_docs[ok].astype(np.int64) << 16) | shifted[ok])]
+        docs, counts = np.unique(starts >> 16, return_counts=True)
+        return docs.astype(np.int32), counts.astype(np.int32)
+
+    def search(self, query, candidates=None):
+        """Docs matching every clause of ``query``, best BM25 score first.
+
+        ``candidates`` optionally restricts hits to these sorted doc positions
+        (e.g. from ``filter_positions``). Returns ``(docs, scores)``.
+        """
+        clauses = [self.clause_postings(tokens) for tokens in parse_query(query)]
+        if not clauses:
+            return np.array([], dtype=np.int32), np.array([])
+
+        # Intersect the rarest postings first
+        clauses.sort(key=lambda c: len(c[0]))
+        matched = clauses[0][0]
+        if candidates is not None:
+            matched = np.intersect1d(matched, candidates, assume_unique=True)
+        for docs, _ in clauses[1:]:
+            if not len(matched):
+                break
+            matched = np.intersect1d(matched, docs, assume_unique=True)
+        if not len(matched):
+            return matched, np.array([])
+
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[matched] / self.avg_len)
+        scores = np.zeros(len(matched))
+        for docs, tf in clauses:
+            df = len(docs)
+            idf = np.log((self.n_docs - df + 0.5) / (df + 0.5) + 1)
+            f = tf[np.searchsorted(docs, matched)]
+            scores += idf * f * (BM25_K1 + 1) / (f + norm)
+
+        order = np.argsort(-scores, kind="stable")
+        return matched[order], scores[order]
+
+    def docs_matching_any(self, clauses):
+        """Sorted docs matching at least one of the clauses."""
+        postings = [self.clause_postings(tokens)[0] for tokens in clauses]
+        if not postings:
+            return np.array([], dtype=np.int32)
+        return np.unique(np.concatenate(postings))
+
+
+def _starts(sorted_ids, n):
+    """CSR offsets of each id's run in an ascending id array."""
+    return np.concatenate([[0], np.cumsum(np.bincount(sorted_ids, minlength=n))])
+
+
+# =========================
+# Snippets
+# =========================
+
+def clause_regex(clauses):
+    """Case-insensitive regex matching any clause (a term or phrase) as whole words."""
+    patterns = [r"\W+".join(map(re.escape, tokens)) for tokens in clauses]
+    return re.compile(r"\b(?:" + "|".join(patterns) + r")\b", re.IGNORECASE)
+
+
+def escape_markdown(text):
+    return re.sub(r"([\\`*_\[\]#$<>|~])", r"\\\1", text)
+
+
+def snippet(text, query, width=220):
+    """Markdown window of ``text`` around the first match of ``query``, matches in bold."""
+    if not isinstance(text, str):
+        return ""
+    text = " ".join(text.split())
+    clauses = parse_query(query)
+    if not clauses:
+        return escape_markdown(text[:width])
+    regex = clause_regex(clauses)
+
+    # Start a third of the window before the first match, on a word boundary
+    match = regex.search(text)
+    start = 0 if match is None else max(match.start() - width // 3, 0)
+    if start:
+        start = text.find(" ", start) + 1 or start
+    end = min(start + width, len(text))
+    if end < len(text):
+        end = max(text.rfind(" ", start, end), start + width // 2)
+
+    parts = re.split(f"({regex.pattern})", text[start:end], flags=re.IGNORECASE)
+    body = "".join(
+        f"**{escape_markdown(part)}**" if i % 2 else escape_markdown(part)
+        for i, part in enumerate(parts)
+    )
+    return ("…" if start else "") + body + ("…" if end < len(text) else "")
@@ -0,0 +1,200 @@
+"""Disk-cached computations behind each page's views.
+
+Pages and the start-up warm-up (``utils.warmup``) both go through these
+functions, so a view precomputed at deploy time is served from the
+persistent cache on the first visit. Keys combine the dataset key with the
+normalized filter parameters.
+"""
+import os
+
+import pandas as pd
+
+from utils.aspects import aspect_sentiment
+from utils.charts import (
+    SENTIMENT_CATEGORIES, correlation_heatmap, figure_png, phrase_wordcloud, sentiment_scatter,
+    tier_heatmap,
+)
+from utils.comparables import ComparablesIndex
+from utils.data import (
+    LISTINGS_PATH, NLP_PATH, dataset_version, listings_from_reviews, read_nlp, read_reviews,
+)
+from utils.disk_cache import disk_cached
+from utils.hosts import HostPortfolios
+from utils.queries import (
+    average_price, fit_topic_model, phrase_counts, price_tier_metrics, score_correlations, topic_mentions,
+)
+from utils.spatial import GridIndex
+from utils.text_index import TextIndex
+
+
+def review_params(neighbourhoods=None, price_range=None):
+    """Normalized cache parameters for the Review Narratives filters."""
+    return {
+        # () is an empty selection (matches nothing), None means no restriction
+        'neighbourhoods': None if neighbourhoods is None else tuple(sorted(neighbourhoods)),
+        'price_range': None if price_range is None else (float(price_range[0]), float(price_range[1])),
+    }
+
+
+# =========================
+# Datasets (parsed frames, much faster to unpickle than to re-parse the CSVs)
+#
+# Frames and the indexes built over them skip the disk cache's in-process
+# tier (memory=False); utils.store keeps them under its memory budget.
+# =========================
+
+def reviews_frame(version, path=LISTINGS_PATH):
+    return disk_cached("reviews_frame", version, None, lambda: read_reviews(path), memory=False)
+
+
+def listings_frame(version, path=LISTINGS_PATH):
+    return disk_cached(
+        "listings_frame", version, None,
+        lambda: listings_from_reviews(reviews_frame(version, path)), memory=False,
+    )
+
+
+def nlp_frame(version, path=NLP_PATH):
+    return disk_cached("nlp_frame", version, None, lambda: read_nlp(path), memory=False)
+
+
+# Dataset kind -> (partition file attribute, per-partition loader)
+SOURCES = {
+    'reviews': ('listings_path', reviews_frame),
+    'listings': ('listings_path', listings_frame),
+    'nlp': ('nlp_path', nlp_frame),
+}
+
+
+def partition_sources(kind, partitions):
+    """``(partition, version)`` pairs of the partitions that have a ``kind`` file."""
+    attr = SOURCES[kind][0]
+    return tuple(
+        (p, dataset_version(getattr(p, attr)))
+        for p in partitions if os.path.exists(getattr(p, attr))
+    )
+
+
+def dataset_key(kind, sources):
+    """Dataset key of a partition set; a single partition keeps the plain ``(kind, version)`` key."""
+    versions = tuple(version for _, version in sources)
+    return (kind, versions[0] if len(versions) == 1 else versions)
+
+
+def load_partitions(kind, sources):
+    """One frame for the partition set, concatenated from the per-partition cached frames."""
+    attr, frame = SOURCES[kind]
+    frames = [frame(version, getattr(p, attr)) for p, version in sources]
+    if not frames:
+        raise FileNotFoundError(f"no {kind} data in the selected partitions")
+    # the parts are not retained anywhere, so only the concatenated copy stays alive
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+# =========================
+# Map Exploration
+# =========================
+
+def map_view(reviews, dataset_key):
+    """Listing-level map rows, their spatial index and neighbourhood centroids."""
+    def compute():
+        df1 = reviews.assign(rating=reviews['review_scores_rating'] if 'review_scores_rating' in reviews.columns else None)
+        df1 = df1.dropna(subset=['latitude', 'longitude', 'price', 'room_type', 'neighbourhood', 'rating'])
+
+        # Rename and deduplicate
+        df1 = df1.rename(columns={"room_type": "Room Type"})
+        if 'listing_id' in df1.columns and 'review_date' in df1.columns:
+            df1 = df1.sort_values('review_date').drop_duplicates('listing_id', keep='last')
+        df1 = df1.reset_index(drop=True)
+
+        index = GridIndex(df1['latitude'].to_numpy(), df1['longitude'].to_numpy())
+        centroids = df1.groupby('neighbourhood')[['latitude', 'longitude']].median()
+        return df1, index, centroids
+    return disk_cached("map_view", dataset_key, None, compute, memory=False)
+
+
+# =========================
+# Price Insights / Comparable Listings / Host Portfolios
+# =========================
+
+def average_price_table(reviews, dataset_key):
+    return disk_cached("average_price", dataset_key, None, lambda: average_price(reviews))
+
+
+def comparables_index(listings, dataset_key):
+    return disk_cached("comparables_index", dataset_key, None, lambda: ComparablesIndex(listings), memory=False)
+
+
+def host_portfolios(listings, dataset_key):
+    return disk_cached("host_portfolios", dataset_key, None, lambda: HostPortfolios(listings), memory=False)
+
+
+# =========================
+# Review Narratives
+# =========================
+
+def topic_model(filtered, dataset_key, params):
+    return disk_cached("topic_model", dataset_key, params, lambda: fit_topic_model(filtered, n_topics=5))
+
+
+def topic_table(filtered, dataset_key, params):
+    return disk_cached(
+        "topic_mentions", dataset_key, params,
+        lambda: topic_mentions(topic_model(filtered, dataset_key, params), filtered),
+    )
+
+
+def phrase_table(filtered, dataset_key, params):
+    return disk_cached("phrase_counts", dataset_key, params, lambda: phrase_counts(filtered))
+
+
+def wordcloud_png(filtered, dataset_key, params):
+    """PNG bytes of the phrase word cloud, or ``None`` if no phrases were found."""
+    def compute():
+        phrases = phrase_table(filtered, dataset_key, params)
+        return figure_png(phrase_wordcloud(phrases)) if phrases else None
+    return disk_cached("wordcloud_png", dataset_key, params, compute)
+
+
+def sentiment_rows(filtered):
+    """Reviews with every aspect sentiment and a rating, as the scatter plots need."""
+    sent_cols = [f"sentiment_{k}" for k in SENTIMENT_CATEGORIES]
+    return filtered.dropna(subset=sent_cols + ["review_scores_rating"])
+
+
+def sentiment_scatter_png(filtered, dataset_key, params):
+    """PNG bytes of the sentiment-vs-rating scatters, or ``None`` without data."""
+    def compute():
+        df_sent = sentiment_rows(filtered)
+        return None if df_sent.empty else figure_png(sentiment_scatter(df_sent))
+    return disk_cached("sentiment_scatter_png", dataset_key, params, compute)
+
+
+def tier_heatmap_pngs(filtered, dataset_key, params, n_bins):
+    """PNG bytes of the (average rating, average sentiment) price-tier heatmaps."""
+    def compute():
+        tiers = price_tier_metrics(filtered, n_bins)
+        bin_labels = list(tiers.index)
+        return (
+            figure_png(tier_heatmap(tiers['avg_rating'], bin_labels, "Average Rating", vmin=4.6, vmax=5.0)),
+            figure_png(tier_heatmap(tiers['avg_sentiment'], bin_labels, "Average Sentiment", vmin=0.65, vmax=0.85)),
+        )
+    return disk_cached("tier_heatmaps_png", dataset_key, {**params, 'bins': n_bins}, compute)
+
+
+def correlation_png(filtered, dataset_key, params):
+    """PNG bytes of the sub-score correlation matrix, or ``None`` without enough columns."""
+    def compute():
+        corr, labels = score_correlations(filtered)
+        return None if corr is None else figure_png(correlation_heatmap(corr, labels))
+    return disk_cached("correlation_png", dataset_key, params, compute)
+
+
+def text_index(reviews, dataset_key):
+    """Full-text index over ``review_content``; docs are row positions of ``reviews``."""
+    return disk_cached("text_index", dataset_key, None, lambda: TextIndex(reviews['review_content']), memory=False)
+
+
+def aspect_table(reviews, index, dataset_key, clauses):
+    """Per-review sentiment for a user-defined aspect (see ``utils.aspects``), cached per definition."""
+    return disk_cached("aspect_sentiment", dataset_key, {'aspect': clauses}, lambda: aspect_sentiment(reviews, index, clauses))
@@ -0,0 +1,108 @@
+"""Precompute the default view of every page (default city) into the persistent disk cache.
+
+Run after a deploy, before traffic arrives::
+
+    python -m utils.warmup
+
+A server started with ``AIRBNB_WARM_UP=1`` also runs it in a background
+thread once per process (see ``utils.store``). Frames and the views pages
+hold through ``shared_view`` then go into ``utils.store``'s memory-budgeted
+cache under the pages' own keys, and the progressive charts go through the
+same in-flight jobs as the pages, so visitors arriving meanwhile wait for
+the warm-up's result instead of computing it a second time.
+"""
+import logging
+import threading
+import time
+
+from utils.data import DEFAULT_CITY
+from utils.disk_cache import cache_key, prune
+from utils.queries import apply_filters
+from utils.views import (
+    average_price_table, comparables_index, correlation_png, host_portfolios, map_view, review_params,
+    sentiment_scatter_png, text_index, tier_heatmap_pngs, topic_table, wordcloud_png,
+)
+
+logger = logging.getLogger(__name__)
+
+# Review Narratives defaults: "All" neighbourhoods, full price range, quartile tiers
+DEFAULT_TIERS = 4
+
+
+# utils.store and utils.progressive are imported inside the steps: utils.store
+# imports this module to start the warm-up thread
+
+def _warm_listings():
+    from utils.store import load_shared, shared_view
+
+    reviews, key = load_shared('reviews', DEFAULT_CITY)
+    map_key = ("map",) + key
+    shared_view("map_view", map_key, lambda: map_view(reviews, map_key), None)
+    average_price_table(reviews, key)
+    listings, key = load_shared('listings', DEFAULT_CITY)
+    shared_view("comparables_index", key, lambda: comparables_index(listings, key), None)
+    shared_view("host_portfolios", key, lambda: host_portfolios(listings, key), None)
+
+
+def _exact(name, key, params, compute):
+    """Run ``compute`` as the pages' background job for the same chart would."""
+    from utils.progressive import submit_exact
+
+    return submit_exact(cache_key(name, key, params), compute).result()
+
+
+def _warm_reviews():
+    from utils.store import load_shared, shared_view
+
+    nlp, key = load_shared('nlp', DEFAULT_CITY)
+
+    price_range = (int(nlp['price'].min()), int(nlp['price'].max()))
+    params = review_params(None, price_range)
+    filtered = apply_filters(nlp, price_range=params['price_range'])
+    _exact("topic_mentions", key, params, lambda: topic_table(filtered, key, params))
+    _exact("wordcloud_png", key, params, lambda: wordcloud_png(filtered, key, params))
+    _exact("sentiment_scatter_png", key, params, lambda: sentiment_scatter_png(filtered, key, params))
+
+    params = review_params()
+    tier_heatmap_pngs(nlp, key, params, DEFAULT_TIERS)
+    correlation_png(nlp, key, params)
+    if 'review_content' in nlp.columns:
+        shared_view("text_index", key, lambda: text_index(nlp, key), None)
+
+
+STEPS = [
+    ("listings, map, price and host views", _warm_listings),
+    ("review narrative views", _warm_reviews),
+    ("cache pruning", prune),
+]
+
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def warm_default_views():
+    """Run every warm-up step; a failing step is logged and skipped."""
+    for label, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warm-up of %s failed", label)
+        else:
+            logger.info("Warmed %s in %.1fs", label, time.perf_counter() - start)
+
+
+def start_warm_up():
+    """Run ``warm_default_views`` in a daemon thread, once per process."""
+    global _thread
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=warm_default_views, name="warm-up", daemon=True)
+            _thread.start()
+    return _thread
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    warm_default_views()